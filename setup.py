@@ -56,5 +56,6 @@ setup(name='theverse',
           'Topic :: Education :: Testing',
       ],
       entry_points = {
+          'console_scripts': ['theverse = theverse.cmdline:main'],
       },
 )
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import itertools
+import pytest
+from theverse.classes import Universe
+from theverse.classes.astronomy import Planet, PlanetarySystem, Star
+
+
+
+
+REFERENCE = 'Test data (01 January 2020)'
+
+_universe_numbers = itertools.count()
+
+
+@pytest.fixture
+def universe():
+    '''
+    Small universe of one star and two planets, separate from the default
+    universe, so that tests can modify it freely.
+    '''
+    universe = Universe(f'Test Universe {next(_universe_numbers)}')
+    PlanetarySystem('Test System', universe=universe, reference=REFERENCE)
+    Star('Test Star', universe=universe, reference=REFERENCE, planetary_system='Test System',
+         mass='2e30 kg', distance='0 m', spectral_type='G2V')
+    Planet('Alpha', universe=universe, reference=REFERENCE, planetary_system='Test System', primary='Test Star',
+           mass='6e24 kg', equatorial_radius='6400 km', polar_radius='6350 km',
+           semimajor_axis='1 AU', eccentricity='0.02')
+    Planet('Beta', universe=universe, reference=REFERENCE, planetary_system='Test System', primary='Test Star',
+           mass='6e23 kg', volumetric_mean_radius='3400 km',
+           semimajor_axis='1.5 AU', eccentricity='0.09')
+    return universe
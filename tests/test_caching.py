@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import numpy
+from conftest import REFERENCE
+
+
+
+
+def test_column_is_cached(universe):
+    planets = universe.planets
+    assert planets.column('mass') is planets.column('mass')
+
+
+def test_linking_invalidates_column(universe):
+    planets = universe.planets
+    generation = planets.generation
+    assert len(planets.column('name')) == 2
+    universe.planets['Beta'].unlink()
+    assert planets.generation > generation
+    assert planets.column('name').tolist() == ['Alpha']
+
+
+def test_revising_linked_object_invalidates_dotted_paths(universe):
+    planets = universe.planets
+    star = universe.stars['Test Star']
+    assert planets.column('primary.mass').value.tolist() == [2e30, 2e30]
+    assert planets.evaluate('mass / primary.mass').value.tolist() == [3e-6, 3e-7]
+    assert star.planets.column('primary.mass').value.tolist() == [2e30, 2e30]
+    assert planets.validate() == []
+
+    star.revise(date='2021-01-01', reference=REFERENCE, mass='3e24 kg')
+    assert planets.column('primary.mass').value.tolist() == [3e24, 3e24]
+    assert planets.evaluate('mass / primary.mass').value.tolist() == [2.0, 0.2]
+    assert star.planets.column('primary.mass').value.tolist() == [3e24, 3e24]
+    assert [v.name for v in planets.validate()] == ['Alpha']
+
+
+def test_column_without_values_is_a_quantity(universe):
+    stars = universe.stars
+    column = stars.column('declination')
+    assert column.unit == 'rad'
+    assert numpy.isnan(column.value).all()
+    assert numpy.isnan(universe.planets.column('primary.declination').value).all()
+    assert numpy.isnan(universe.planets.column('inclination').value).all()
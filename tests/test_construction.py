@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import math
+import astropy.units
+import pytest
+from theverse.classes.astronomy import Planet
+from theverse.classes.quantity import Quantity
+from conftest import REFERENCE
+
+
+
+
+def test_quantity_strings_are_converted_to_si():
+    for value, unit in [('1 AU', 'AU'), ('7.00487 deg', 'deg'), ('2439.7 km', 'km'),
+                        ('1_234.5 g', 'g'), ('.5 km / s', 'km / s'), ('0.20563069', '')]:
+        quant = Quantity(value, reference=REFERENCE)
+        expected = astropy.units.Quantity(value.replace('_', '')).si
+        assert quant.value == expected.value
+        assert quant.unit == expected.unit
+    assert Quantity('5 ± 2 km', reference=REFERENCE).uncertainty.value == 2000.0
+    assert Quantity('5 km', uncertainty=2, reference=REFERENCE).uncertainty.value == 2000.0
+    assert math.isnan(Quantity('nan kg', reference=REFERENCE).value)
+
+
+def test_untrusted_construction(universe):
+    planet = Planet('Gamma', universe=universe, reference=REFERENCE, primary='Test Star',
+                    mass='3e20 g', semimajor_axis='2 AU', inclination='90 deg')
+    assert planet.mass.value == 3e17
+    assert planet.mass.name == 'mass'
+    assert planet.mass.object is planet
+    assert planet.semimajor_axis.unit == 'm'
+    assert planet.inclination.value == pytest.approx(math.pi / 2)
+    assert planet.star is universe.stars['Test Star']
+
+    with pytest.raises(TypeError):
+        Planet('Delta', universe=universe, reference=REFERENCE, mass='3 m')
+    with pytest.raises(TypeError):
+        Planet('Delta', universe=universe, reference=REFERENCE, mass=Quantity('3 kg', reference=REFERENCE).to('g'))
+
+
+def test_trusted_construction(universe):
+    star = universe.stars['Test Star']
+    mass = Quantity('3e20 kg', reference=REFERENCE)
+    planet = Planet.from_trusted('Gamma', universe=universe, reference=REFERENCE, primary=star,
+                                 mass=mass, semimajor_axis=3e11,
+                                 polar_radius=Quantity('6000 km', reference=REFERENCE).to('km'),
+                                 equatorial_radius=astropy.units.Quantity(6.1, 'Mm'))
+    assert planet.mass is mass
+    assert planet.mass.object is planet
+    assert planet.semimajor_axis.value == 3e11
+    assert planet.semimajor_axis.unit == 'm'
+    assert planet.semimajor_axis.name == 'semimajor axis'
+    # Quantities in non-SI units are converted
+    assert planet.polar_radius.value == 6e6
+    assert planet.polar_radius.unit == 'm'
+    assert planet.equatorial_radius.value == 6.1e6
+    assert planet.equatorial_radius.object is planet
+    assert planet.star is star
+
+    with pytest.raises(TypeError):
+        Planet.from_trusted('Delta', universe=universe, reference=REFERENCE,
+                            mass=astropy.units.Quantity(3, 'm'))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import numpy
+import astropy.constants
+import astropy.units
+from theverse.classes.astronomy import Planet
+from theverse.classes.ephemeris import J2000
+from conftest import REFERENCE
+
+
+
+
+def _orbit(universe, name, **kwargs):
+    elements = {'semimajor_axis': '1 AU', 'eccentricity': '0', 'inclination': '0 deg',
+                'longitude_of_ascending_node': '0 deg', 'longitude_of_perihelion': '0 deg',
+                'mean_longitude': '0 deg'}
+    elements.update(kwargs)
+    return Planet(name, universe=universe, reference=REFERENCE, primary='Test Star', **elements)
+
+
+def test_ephemeris_of_known_orbits(universe):
+    circular = _orbit(universe, 'Circular')
+    eccentric = _orbit(universe, 'Eccentric', eccentricity='0.5')
+    polar = _orbit(universe, 'Polar', inclination='90 deg')
+    ephemeris = universe.ephemeris(Planet)
+    assert ephemeris is universe.ephemeris(Planet)
+    # Planets without complete orbital elements are not included
+    assert ephemeris.bodies == [circular, eccentric, polar]
+
+    a = astropy.units.au.to(astropy.units.m)
+    gm = astropy.constants.G.si.value * 2e30
+    period = 2 * numpy.pi * numpy.sqrt(a**3 / gm)
+    epochs = [0, period / 4, period / 2] * astropy.units.s
+    positions, velocities = ephemeris.state(epochs)
+    positions = positions.to_value(astropy.units.m) / a
+    velocities = velocities.to_value(astropy.units.m / astropy.units.s)
+    assert positions.shape == (3, 3, 3)
+
+    assert numpy.allclose(positions[0], [[1, 0, 0], [0, 1, 0], [-1, 0, 0]], atol=1e-12)
+    assert numpy.allclose(velocities[0, 0], [0, numpy.sqrt(gm / a), 0])
+    # Perihelion at epoch and aphelion after half a period
+    assert numpy.allclose(positions[1, [0, 2]], [[0.5, 0, 0], [-1.5, 0, 0]], atol=1e-12)
+    assert numpy.allclose(positions[2], [[1, 0, 0], [0, 0, 1], [-1, 0, 0]], atol=1e-12)
+
+    # Epochs may also be given as times
+    assert numpy.allclose(ephemeris.positions(J2000 + period * astropy.units.s).to_value(astropy.units.m) / a,
+                          positions[:, [0]], atol=1e-9)
+
+    eccentric.unlink()
+    assert universe.ephemeris(Planet).bodies == [circular, polar]
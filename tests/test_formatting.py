@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import math
+import astropy.units
+import pytest
+from theverse.classes.formatting import format_quantities, format_values, unit_string
+
+
+
+
+def test_format_values():
+    assert format_values([5.9724e24, 1234.5, 0.0001234, math.nan], 'kg') == \
+        ['5.972e24 kg', '1234 kg', '1.234e-4 kg', None]
+    assert format_values([9.9996], sig_figs=4) == ['10.00']
+    assert format_values([5.9724e24], 'kg', style='unicode') == ['5.972 × 10²⁴ kg']
+    assert format_values([5.9724e24], 'kg', style='latex') == ['5.972 \\times 10^{24}\\,\\mathrm{kg}']
+    assert format_values([5.9724e24], 'kg', name='mass') == ['mass = 5.972e24 kg']
+
+
+@pytest.mark.parametrize('unit, text', [
+    ('kg', 'kg'),
+    ('m / s', 'm/s'),
+    ('1 / s', '1/s'),
+    ('m2 kg', 'm2 kg'),
+    ('m3 / (kg s2)', 'm3/(kg s2)'),
+    ('kg m2 / s2', 'm2 kg/s2'),
+])
+def test_composite_unit_text(unit, text):
+    unit = astropy.units.Unit(unit)
+    assert unit_string(unit, 'text') == text
+    # Text units can be parsed again
+    assert astropy.units.Unit(text) == unit
+
+
+def test_composite_unit_styles():
+    unit = astropy.units.Unit('m3 / (kg s2)')
+    assert format_values([6.674e-11], unit) == ['6.674e-11 m3/(kg s2)']
+    assert format_values([6.674e-11], unit, style='unicode') == ['6.674 × 10⁻¹¹ m³ kg⁻¹ s⁻²']
+    assert format_values([6.674e-11], unit, style='latex') == \
+        ['6.674 \\times 10^{-11}\\,\\mathrm{m^{3}\\,kg^{-1}\\,s^{-2}}']
+
+
+def test_format_quantities():
+    quantities = [astropy.units.Quantity(1, 'km'), astropy.units.Quantity(2500, 'm')]
+    assert format_quantities(quantities, sig_figs=2) == ['1.0 km', '2.5 km']
+
+
+def test_format_column(universe):
+    planets = universe.planets
+    assert planets.format_column('polar_radius') == ['6.350e6 m', None]
+    assert planets.format_column('mass', names=True, sig_figs=2) == ['mass = 6.0e24 kg', 'mass = 6.0e23 kg']
+    # No star has a declination
+    assert universe.stars.format_column('declination') == [None]
+    assert planets.format_column('primary.declination') == [None, None]
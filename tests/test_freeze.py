@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pytest
+from theverse.classes.astronomy import Planet
+from theverse.classes.citation import citations
+from theverse.classes.base import FrozenLinkDict
+from theverse.err import TheVerseError
+from conftest import REFERENCE
+
+
+
+
+def test_freeze(universe):
+    alpha = universe.planets['Alpha']
+    mass_column = universe.planets.column('mass')
+    universe.freeze()
+    assert universe.frozen
+    assert isinstance(universe.planets, FrozenLinkDict)
+    assert isinstance(universe.stars['Test Star'].planets, FrozenLinkDict)
+    assert universe.planets.column('mass').value.tolist() == mass_column.value.tolist()
+    with pytest.raises(TheVerseError):
+        Planet('Gamma', universe=universe, reference=REFERENCE)
+    with pytest.raises(TheVerseError):
+        alpha.revise(date='2021-01-01', reference=REFERENCE, mass='7e24 kg')
+    with pytest.raises(TheVerseError):
+        alpha.unlink()
+    with pytest.raises(TheVerseError):
+        universe.reload()
+
+
+def test_freeze_keeps_provenance(universe):
+    alpha = universe.planets['Alpha']
+    reference = f'Frozen provenance test for {universe.name} (01 February 2021)'
+    alpha.revise(reference=reference, mass='7e24 kg', polar_radius='6360 km')
+    old_mass = alpha.revisions('mass')[0][1]
+    values = citations.values_from(reference)
+    assert len(values) == 2
+    universe.freeze()
+    assert '_links' not in alpha.__dict__
+    assert '_unlinking' not in alpha.__dict__
+    assert [id(value) for value in citations.values_from(reference)] == [id(value) for value in values]
+    assert citations.find(reference)[0].objects == [alpha]
+    for value in (alpha.mass, old_mass, alpha.equatorial_radius):
+        assert value.object is alpha
+    assert universe.stars['Test Star'].spectral_type.object is universe.stars['Test Star']
+    assert any(value is old_mass for value in alpha.citation.values)
+    assert alpha.mass.value == 7e24
+    assert universe.as_of('2021-01-01').planets['Alpha'].mass.value == 6e24
+    assert [c.reference for c in citations.bibliography([alpha])] == [REFERENCE, reference]
+
+
+def test_freeze_checks_consistency(universe):
+    alpha = universe.planets['Alpha']
+    alpha.__dict__['mass'] = alpha.mass.to('g')
+    with pytest.raises(TheVerseError, match='unit'):
+        universe.freeze()
+    assert not universe.frozen
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import numpy
+import pytest
+from theverse.classes.astronomy import Planet
+from theverse.err import TheVerseError
+from conftest import REFERENCE
+
+
+
+
+def test_agg(universe):
+    Planet('Gamma', universe=universe, reference=REFERENCE, mass='2e24 kg', equatorial_radius='5000 km')
+    result = universe.planets.group_by('primary').agg(
+        count=('mass', 'count'), total=('mass', 'sum'), mass='mean', equatorial_radius='max')
+    assert result['primary'].tolist() == ['Test Star']
+    assert result['count'].tolist() == [2]
+    assert result['total'].value.tolist() == [6.6e24]
+    assert result['mass'].value.tolist() == [3.3e24]
+    assert result['equatorial_radius'].value.tolist() == [6.4e6]
+
+
+def test_agg_of_sparse_attributes(universe):
+    # Only Alpha has a polar radius, and no star has a declination
+    result = universe.planets.group_by('planetary_system').agg(
+        polar_radius='mean', declination=('primary.declination', 'mean'), count=('polar_radius', 'count'))
+    assert result['polar_radius'].value.tolist() == [6.35e6]
+    assert result['count'].tolist() == [1]
+    assert result['declination'].unit == 'rad'
+    assert numpy.isnan(result['declination'].value).all()
+    result = universe.stars.group_by('spectral_type').agg(declination='mean')
+    assert result['spectral_type'].tolist() == ['G2V']
+    assert numpy.isnan(result['declination'].value).all()
+
+
+def test_agg_of_strings(universe):
+    with pytest.raises(TheVerseError):
+        universe.planets.group_by('planetary_system').agg(spectral_type=('primary.spectral_type', 'mean'))
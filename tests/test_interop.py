@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pytest
+from theverse.classes.astronomy import Planet
+from theverse.err import TheVerseError
+from conftest import REFERENCE
+
+
+
+
+def _reimport(universe, convert, from_converted):
+    '''
+    Export the planets of a universe, unlink them, and import them again.
+    Returns the original and imported planets.
+    '''
+    originals = dict(universe.planets)
+    converted = convert(universe.planets)
+    for planet in originals.values():
+        planet.unlink()
+    imported = from_converted(converted)
+    return (originals, imported)
+
+
+def _assert_same(originals, imported):
+    assert list(imported) == list(originals)
+    for name, original in originals.items():
+        planet = imported[name]
+        assert set(planet.__dict__) == set(original.__dict__)
+        for k in (*Planet._attr_units, *Planet._attr_strings):
+            if k in original.__dict__:
+                assert planet.__dict__[k].value == pytest.approx(original.__dict__[k].value, rel=1e-15)
+        assert planet.primary is original.primary
+        assert planet.citation is original.citation
+
+
+def test_pandas_round_trip(universe):
+    pytest.importorskip('pandas')
+    dataframe = universe.planets.to_pandas()
+    assert 'radius' not in dataframe.columns
+    assert dataframe.attrs['units']['mass'] == 'kg'
+    assert dataframe['primary'].tolist() == ['Test Star', 'Test Star']
+    originals, imported = _reimport(universe, lambda planets: planets.to_pandas(),
+                                    lambda dataframe: Planet.from_pandas(dataframe, universe=universe))
+    _assert_same(originals, imported)
+    assert universe.planets['Alpha'] is imported['Alpha']
+
+
+def test_arrow_round_trip(universe):
+    pytest.importorskip('pyarrow')
+    originals, imported = _reimport(universe, lambda planets: planets.to_arrow(),
+                                    lambda table: Planet.from_arrow(table, universe=universe))
+    _assert_same(originals, imported)
+
+
+def test_stored_fallback_attrs_are_exported(universe):
+    pytest.importorskip('pandas')
+    universe.planets['Beta'].unlink()
+    Planet('Gamma', universe=universe, reference=REFERENCE, mass='1e24 kg', radius='2000 km')
+    dataframe = universe.planets.to_pandas()
+    assert dataframe['radius'].isna().tolist() == [True, False]
+    assert 'radius' not in universe.planets['Alpha'].__dict__
+    assert universe.planets['Alpha'].radius.value == 6.4e6
+
+
+def test_duplicate_names_are_rejected(universe):
+    pytest.importorskip('pandas')
+    dataframe = universe.planets.to_pandas()
+    with pytest.raises(TheVerseError, match='already exists'):
+        Planet.from_pandas(dataframe, universe=universe)
+    assert len(universe.planets) == 2
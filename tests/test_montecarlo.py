@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import numpy
+from theverse.classes.montecarlo import MonteCarlo
+from theverse.classes.quantity import Quantity
+from conftest import REFERENCE
+
+
+
+
+def test_propagate():
+    mc = MonteCarlo(100_000, seed=1)
+    mass = Quantity('5 ± 0.1 kg', reference=REFERENCE)
+    samples = mc.propagate(lambda m: 2 * m, mass)
+    assert samples.shape == (100_000,)
+    assert abs(samples.mean().value - 10) < 0.01
+    assert abs(samples.std().value - 0.2) < 0.01
+
+
+def test_sample_attr(universe):
+    mc = MonteCarlo(10, seed=2)
+    samples = mc.sample_attr(universe.planets.values(), 'radius')
+    assert samples.shape == (2, 10)
+    # Quantities without uncertainties are exact
+    assert numpy.all(samples[0].value == 6.4e6)
+    assert numpy.all(samples[1].value == 3.4e6)
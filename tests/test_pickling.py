@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pickle
+import theverse
+from theverse.classes.base import pickle_by_value
+from conftest import REFERENCE
+
+
+
+
+def test_dataset_objects_pickle_as_references():
+    earth = theverse.universe.planets.earth
+    assert pickle.loads(pickle.dumps(earth)) is earth
+    assert pickle.loads(pickle.dumps(theverse.universe)) is theverse.universe
+
+
+def test_pickle_by_value(universe):
+    alpha = universe.planets['Alpha']
+    alpha.revise(date='2021-01-01', reference=REFERENCE, mass='7e24 kg')
+    with pickle_by_value():
+        data = pickle.dumps(alpha)
+    copy = pickle.loads(data)
+    assert copy is not alpha
+    assert copy.universe is universe
+    # Links within the test universe are pickled by value too
+    assert copy.primary.name == 'Test Star'
+    assert copy.mass.value == 7e24
+    assert copy.mass.object is copy
+    assert [v.value for _, v in copy.revisions('mass')] == [6e24, 7e24]
+    assert copy.citation is alpha.citation
+    # The copy is detached
+    assert universe.planets['Alpha'] is alpha
+    assert 'Alpha' in universe.stars['Test Star'].planets
+
+
+def test_unpickling_does_not_index_values(universe):
+    alpha = universe.planets['Alpha']
+    citation = alpha.citation
+    with pickle_by_value():
+        data = pickle.dumps(alpha)
+    values = [id(value) for value in citation.values]
+    copy = pickle.loads(data)
+    assert [id(value) for value in citation.values] == values
+    assert not any(value is copy.mass for value in citation.values)
+    assert copy not in citation.objects
+
+
+def test_unknown_universe(universe):
+    with pickle_by_value():
+        data = pickle.dumps(universe.planets['Alpha'])
+    universe.unlink()
+    # Records do not need the universe
+    copy = pickle.loads(data)
+    assert 'universe' not in copy.__dict__
+    assert copy.mass.value == 6e24
+    assert copy.primary.name == 'Test Star'
+    assert 'universe' not in copy.primary.__dict__
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import importlib
+import itertools
+import sys
+import pytest
+from theverse.classes import Universe
+from theverse.classes.astronomy import Planet, PlanetarySystem
+from theverse.classes.base import _module_source_stamp
+from conftest import REFERENCE
+
+
+
+
+_module_numbers = itertools.count()
+
+_stars_source = '''
+from theverse.classes.astronomy import Star
+Star('Test Star', universe={universe!r}, reference={reference!r}, planetary_system='Test System',
+     mass={mass!r}, distance='0 m')
+'''
+
+
+def _check_consistency(universe):
+    return universe._check_consistency({k: getattr(universe, k) for k in ('planetary_systems', 'stars', 'planets')})
+
+
+@pytest.fixture
+def reload_universe(tmp_path, monkeypatch):
+    '''
+    Universe whose stars are loaded from a data module in a temporary
+    directory, so that the module can be changed and reloaded.
+    '''
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    n = next(_module_numbers)
+    universe = Universe(f'Reload Universe {n}')
+    PlanetarySystem('Test System', universe=universe, reference=REFERENCE)
+    module_name = f'reload_test_stars_{n}'
+    path = tmp_path / f'{module_name}.py'
+    def write_stars(mass, extra=''):
+        path.write_text(_stars_source.format(universe=universe.name, reference=REFERENCE, mass=mass) + extra)
+    write_stars('2e30 kg')
+    module = importlib.import_module(module_name)
+    universe.stars
+    universe._data_modules['stars'] = (module_name, _module_source_stamp(module))
+    Planet('Alpha', universe=universe, reference=REFERENCE, planetary_system='Test System', primary='Test Star',
+           mass='6e24 kg')
+    yield (universe, write_stars)
+    del sys.modules[module_name]
+
+
+def test_reload_relinks_dependents(reload_universe):
+    universe, write_stars = reload_universe
+    old_star = universe.stars['Test Star']
+    planet = universe.planets['Alpha']
+    assert universe.changed_data_modules() == []
+
+    write_stars('3e30 kg')
+    assert universe.reload() == ['stars']
+    star = universe.stars['Test Star']
+    assert star is not old_star
+    assert star.mass.value == 3e30
+    assert planet.primary is star
+    assert planet.star is star
+    assert list(star.planets.values()) == [planet]
+    assert universe.planets.column('primary.mass').value.tolist() == [3e30]
+    # The replaced star no longer refers to the planet
+    assert len(old_star.planets) == 0
+    assert planet not in old_star._links
+    assert all(x is not old_star.planets for x in planet._links)
+    assert _check_consistency(universe) == []
+    assert universe.reload() == []
+
+
+def test_failed_reload_restores_replaced_objects(reload_universe):
+    universe, write_stars = reload_universe
+    old_star = universe.stars['Test Star']
+    planet = universe.planets['Alpha']
+
+    write_stars('3e30 kg', "\nraise ValueError('bad data')\n")
+    with pytest.raises(ValueError):
+        universe.reload()
+    assert universe.stars['Test Star'] is old_star
+    assert old_star.mass.value == 2e30
+    assert planet.primary is old_star
+    assert list(old_star.planets.values()) == [planet]
+    assert universe.planets.column('primary.mass').value.tolist() == [2e30]
+    assert _check_consistency(universe) == []
+    assert universe.changed_data_modules() == ['stars']
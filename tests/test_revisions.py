@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pytest
+from conftest import REFERENCE
+
+
+
+
+def test_revision_becomes_current(universe):
+    star = universe.stars['Test Star']
+    star.revise(date='2021-01-01', reference=REFERENCE, mass='3e30 kg')
+    assert star.mass.value == 3e30
+    assert [value.value for _, value in star.revisions('mass')] == [2e30, 3e30]
+
+
+def test_as_of(universe):
+    star = universe.stars['Test Star']
+    star.revise(date='2021-01-01', reference=REFERENCE, mass='3e30 kg')
+    assert universe.as_of('2020-06-01').stars['Test Star'].mass.value == 2e30
+    assert universe.as_of('2021-06-01').stars['Test Star'].mass.value == 3e30
+    assert universe.as_of('2021-06-01').planets['Alpha'].primary.mass.value == 3e30
+    with pytest.raises(AttributeError):
+        universe.as_of('2019-01-01').stars['Test Star'].mass
+
+
+def test_as_of_with_fallbacks(universe):
+    alpha = universe.planets['Alpha']
+    alpha.revise(date='2021-01-01', reference=REFERENCE, equatorial_radius='6500 km')
+    assert universe.as_of('2020-06-01').planets.alpha.radius.value == 6.4e6
+    assert universe.as_of('2021-06-01').planets.alpha.radius.value == 6.5e6
+    assert universe.as_of('2021-06-01').planets.beta.radius.value == 3.4e6
+    assert universe.as_of('2021-06-01').planets.alpha.star.name == 'Test Star'
+    with pytest.raises(AttributeError):
+        universe.as_of('2019-01-01').planets.alpha.radius
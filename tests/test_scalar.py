@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import astropy.units
+import pytest
+from theverse.classes.scalar import Scalar
+from theverse.err import TheVerseError
+
+
+
+
+def test_arithmetic(universe):
+    alpha = universe.planets['Alpha']
+    g = Scalar(6.674e-11, 'm3 / (kg s2)')
+    acceleration = g * alpha.scalar('mass') / alpha.scalar('radius')**2
+    assert acceleration.unit == astropy.units.Unit('m / s2')
+    assert acceleration.value == pytest.approx(6.674e-11 * 6e24 / 6.4e6**2)
+    assert alpha.scalar('mass').meta is alpha.mass
+    assert alpha.scalar('mass').object is alpha
+    assert alpha.scalar('mass') + Scalar(1e24, 'kg') > alpha.scalar('mass')
+
+
+def test_quantities_do_not_store_scalars(universe):
+    alpha = universe.planets['Alpha']
+    alpha.scalar('mass')
+    assert set(alpha.mass.__dict__) == {'_unit', '_name', '_object', '_citation', '_uncertainty'}
+
+
+@pytest.mark.parametrize('value, unit, si_value, si_unit', [
+    (2, 'km', 2000, 'm'),
+    (1, 'AU', 149597870700, 'm'),
+    (5, '%', 0.05, ''),
+    (3, 'km / s', 3000, 'm / s'),
+    (4, 'J', 4, 'J'),
+])
+def test_units_are_si(value, unit, si_value, si_unit):
+    scalar = Scalar(value, unit)
+    assert scalar.value == pytest.approx(si_value)
+    assert scalar.unit == astropy.units.Unit(si_unit)
+    assert scalar.unit.si.scale == 1.0
+    assert (Scalar(1, 'm') + Scalar(1, 'km')).value == 1001
+
+
+def test_to():
+    energy = Scalar(2, 'kg m2 / s2').to('J')
+    assert (energy.value, energy.unit) == (2, astropy.units.J)
+    with pytest.raises(TheVerseError):
+        Scalar(2, 'm').to('km')
+    with pytest.raises(astropy.units.UnitsError):
+        Scalar(2, 'm').to('kg')
+    assert Scalar(2000, 'm').to_quantity().to_value('km') == 2
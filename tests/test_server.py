@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from theverse import server
+
+
+
+
+@pytest.fixture
+def url(universe):
+    '''
+    URL of a server for the test universe, on a free port.
+    '''
+    httpd = server.ProblemParameterServer(('127.0.0.1', 0), universe, workers=2, quiet=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def request(url, data=None):
+    '''
+    Status and decoded JSON body of a GET request, or of a POST request if
+    `data` is given.
+    '''
+    if data is not None:
+        data = json.dumps(data).encode('utf8')
+    try:
+        with urllib.request.urlopen(url, data, timeout=10) as response:
+            return (response.status, json.loads(response.read()))
+    except urllib.error.HTTPError as e:
+        return (e.code, json.loads(e.read()))
+
+
+def test_sample(url):
+    status, data = request(f'{url}/sample?collection=planets&n=2&attrs=mass,radius,primary,primary.spectral_type')
+    assert status == 200
+    assert sorted(data['names']) == ['Alpha', 'Beta']
+    assert set(data['attrs']) == {'mass', 'radius', 'primary', 'primary.spectral_type'}
+    assert data['attrs']['primary'] == ['Test Star', 'Test Star']
+    assert data['attrs']['primary.spectral_type'] == ['G2V', 'G2V']
+    assert data['units']['mass'] == 'kg'
+
+
+@pytest.mark.parametrize('attr', ['bogus', 'primary.planets', 'primary.bogus', 'planetary_system.stars'])
+def test_invalid_attrs(url, attr):
+    status, data = request(f'{url}/sample?collection=planets&n=1&attrs={attr}')
+    assert status == 400
+    assert attr in data['error']
+    status, data = request(f'{url}/sample', {'collection': 'planets', 'attrs': [attr]})
+    assert status == 400
+
+
+@pytest.mark.parametrize('path', ['/sample?collection=comets', '/sample?collection=planets&n=-1',
+                                  '/sample?collection=planets&n=3', '/sample?collection=planets&bogus=1'])
+def test_invalid_params(url, path):
+    status, data = request(f'{url}{path}')
+    assert status == 400
+    assert 'error' in data
+
+
+def test_unknown_path(url):
+    assert request(f'{url}/bogus')[0] == 404
+
+
+def test_internal_error(url, monkeypatch):
+    def sample(*args, **kwargs):
+        raise RuntimeError
+    monkeypatch.setattr(server, 'sample', sample)
+    status, data = request(f'{url}/sample?collection=planets')
+    assert status == 500
+    assert 'error' in data
+    # The server keeps working after an internal error
+    monkeypatch.undo()
+    assert request(f'{url}/collections')[0] == 200
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import numpy
+import astropy.units
+from theverse.classes.astronomy import Star
+from theverse.classes.spatial import KDTree, cartesian
+from conftest import REFERENCE
+
+
+
+
+def test_kdtree_matches_brute_force():
+    rng = numpy.random.default_rng(0)
+    points = rng.normal(size=(500, 3))
+    tree = KDTree(points, leaf_size=4)
+    for point in rng.normal(size=(20, 3)):
+        brute_distances = numpy.sqrt(((points - point)**2).sum(axis=1))
+        brute_order = numpy.argsort(brute_distances, kind='stable')
+
+        distances, indices = tree.query(point, 7)
+        assert indices.tolist() == brute_order[:7].tolist()
+        assert numpy.allclose(distances, brute_distances[brute_order[:7]])
+
+        distances, indices = tree.query_radius(point, 0.8)
+        within = brute_order[brute_distances[brute_order] <= 0.8]
+        assert indices.tolist() == within.tolist()
+        assert numpy.allclose(distances, brute_distances[within])
+
+
+def test_spatial_index_matches_brute_force(universe):
+    rng = numpy.random.default_rng(1)
+    for n in range(200):
+        Star(f'Star {n}', universe=universe, reference=REFERENCE,
+             right_ascension=f'{rng.uniform(0, 360)} deg', declination=f'{rng.uniform(-90, 90)} deg',
+             distance=f'{rng.uniform(1, 100)} pc')
+    index = universe.spatial_index(Star)
+    assert index is universe.spatial_index(Star)
+    assert len(index) == 201
+
+    stars = list(universe.stars.values())
+    positions = numpy.array([star.position.to_value(astropy.units.m) for star in stars])
+    center = universe.stars['Star 0']
+    center_n = stars.index(center)
+    brute_distances = numpy.sqrt(((positions - positions[center_n])**2).sum(axis=1))
+    brute_order = [n for n in numpy.argsort(brute_distances, kind='stable').tolist() if n != center_n]
+    assert [obj for obj, _ in index.nearest(center, 5)] == [stars[n] for n in brute_order[:5]]
+
+    radius = 20 * astropy.units.pc
+    within = [stars[n] for n in brute_order if brute_distances[n] <= radius.to_value(astropy.units.m)]
+    assert [obj for obj, _ in index.within(radius, center)] == within
+
+    ra, dec = 40 * astropy.units.deg, 10 * astropy.units.deg
+    direction = cartesian(1.0, ra, dec)
+    norms = numpy.sqrt((positions**2).sum(axis=1))
+    with numpy.errstate(invalid='ignore'):
+        in_cone = (positions @ direction) / norms >= numpy.cos(numpy.radians(30))
+    cone = {stars[n] for n in numpy.flatnonzero(in_cone).tolist()}
+    assert {obj for obj, _ in index.cone(ra, dec, 30 * astropy.units.deg)} == cone
+
+    universe.stars['Star 0'].unlink()
+    assert len(universe.spatial_index(Star)) == 200
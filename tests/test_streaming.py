@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pytest
+from theverse.classes.astronomy import Planet
+from conftest import REFERENCE
+
+
+
+
+def test_batches(universe):
+    stream = universe.planets.stream(8, ['mass', 'primary'], seed=1)
+    batch = next(stream)
+    assert set(batch) == {'name', 'mass', 'primary'}
+    assert len(batch['name']) == len(batch['mass']) == 8
+    assert set(batch['primary'].tolist()) == {'Test Star'}
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_prefetch_is_deterministic(universe, prefetch):
+    expected = [next(universe.planets.stream(4, seed=2))['name'].tolist()]
+    stream = universe.planets.stream(4, seed=2, prefetch=prefetch)
+    assert [next(stream)['name'].tolist()] == expected
+    stream.close()
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_stream_after_collection_grows(universe, prefetch):
+    stream = universe.planets.stream(64, ['mass'], seed=3, prefetch=prefetch)
+    next(stream)
+    for n in range(10):
+        Planet(f'Extra {n}', universe=universe, reference=REFERENCE, mass='1e24 kg')
+    for _ in range(10):
+        batch = next(stream)
+        assert set(batch['name'].tolist()) <= {'Alpha', 'Beta'}
+        assert len(batch['mass']) == 64
+    stream.close()
+
+
+def test_stream_after_collection_shrinks(universe):
+    stream = universe.planets.stream(16, seed=4)
+    universe.planets['Beta'].unlink()
+    assert set(next(stream)['name'].tolist()) <= {'Alpha', 'Beta'}
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+import pytest
+from theverse.classes.astronomy import Planet, PlanetarySystem
+from theverse.classes.validation import Violation, compile_rule
+from theverse.err import TheVerseError
+from conftest import REFERENCE
+
+
+
+
+def _add_invalid_planets(universe):
+    PlanetarySystem('Other System', universe=universe, reference=REFERENCE)
+    Planet('Flat', universe=universe, reference=REFERENCE, planetary_system='Test System', primary='Test Star',
+           mass='1e24 kg', equatorial_radius='6000 km', polar_radius='6100 km')
+    Planet('Heavy', universe=universe, reference=REFERENCE, planetary_system='Test System', primary='Test Star',
+           mass='3e30 kg', eccentricity='-0.1')
+    Planet('Elsewhere', universe=universe, reference=REFERENCE, planetary_system='Other System', primary='Test Star',
+           mass='1e24 kg')
+
+
+def test_rule_violations(universe):
+    assert universe.planets.validate() == []
+    _add_invalid_planets(universe)
+    violations = universe.planets.validate()
+    assert violations == [
+        Violation('planets', 'Flat', 'polar_radius <= equatorial_radius',
+                  {'polar_radius': 6.1e6, 'equatorial_radius': 6e6}),
+        Violation('planets', 'Heavy', 'mass < primary.mass', {'mass': 3e30, 'primary.mass': 2e30}),
+        Violation('planets', 'Elsewhere', 'primary.planetary_system == planetary_system',
+                  {'primary.planetary_system': 'Test System', 'planetary_system': 'Other System'}),
+        Violation('planets', 'Heavy', 'eccentricity >= 0', {'eccentricity': -0.1}),
+    ]
+
+
+def test_sharded_validation_in_processes(universe):
+    _add_invalid_planets(universe)
+    expected = universe.planets.validate(processes=1)
+    assert universe.planets.validate(processes=2, shard_size=1) == expected
+    assert universe.planets.validate(processes=1, shard_size=2) == expected
+    with pytest.raises(ValueError):
+        universe.planets.validate(shard_size=0)
+    with pytest.raises(ValueError):
+        universe.planets.validate(processes=0)
+
+
+def test_invalid_rules():
+    with pytest.raises(TheVerseError, match='cannot compare'):
+        compile_rule(Planet, 'mass < semimajor_axis')
+    with pytest.raises(TheVerseError, match='links can only be compared'):
+        compile_rule(Planet, 'primary < planetary_system')
+    with pytest.raises(TheVerseError, match='single comparison'):
+        compile_rule(Planet, '0 < mass < primary.mass')
+    with pytest.raises(TheVerseError, match='syntax error'):
+        compile_rule(Planet, 'mass >')
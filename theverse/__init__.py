@@ -11,6 +11,7 @@
 from .version import __version__, __version_info__
 
 
+from .classes.citation import citations
 from .data.universe import universe
 solar_system = universe.planetary_systems.solar_system
 sun = universe.stars.sun
@@ -8,7 +8,9 @@
 #
 
 
+import astropy.units
 from .base import Primordial
+from .spatial import cartesian
 from . import dimensions as dim
 
 
@@ -32,10 +34,29 @@ class Star(Primordial):
     ]
     _attr_units = {
         'mass': dim.mass,
+        'right_ascension': dim.angle,
+        'declination': dim.angle,
+        'distance': dim.length,
     }
     _attr_strings = [
         'spectral_type',
     ]
+    _attr_rules = [
+        'mass > 0',
+        'distance >= 0',
+    ]
+
+    @property
+    def position(self) -> astropy.units.Quantity:
+        '''
+        Heliocentric Cartesian coordinates (equatorial frame), from right
+        ascension, declination, and distance.  Objects at zero distance
+        (the Sun) do not need right ascension and declination.
+        '''
+        distance = self.distance
+        if distance.value == 0:
+            return [0.0, 0.0, 0.0] * distance.unit
+        return cartesian(distance, self.right_ascension, self.declination)
 
 
 
@@ -51,8 +72,24 @@ class Planet(Primordial):
         'volumetric_mean_radius': dim.length,
         'equatorial_radius': dim.length,
         'polar_radius': dim.length,
+        # Keplerian orbital elements, relative to `primary`
+        'semimajor_axis': dim.length,
+        'eccentricity': dim.dimensionless,
+        'inclination': dim.angle,
+        'longitude_of_ascending_node': dim.angle,
+        'longitude_of_perihelion': dim.angle,
+        'mean_longitude': dim.angle,
     }
     _attr_fallbacks = {
         'radius': ('equatorial_radius', 'volumetric_mean_radius'),
         'star': 'primary',
     }
+    _attr_rules = [
+        'mass > 0',
+        'polar_radius <= equatorial_radius',
+        'mass < primary.mass',
+        'primary.planetary_system == planetary_system',
+        'semimajor_axis > 0',
+        'eccentricity >= 0',
+        'eccentricity < 1',
+    ]
@@ -13,13 +13,35 @@ Base classes for representing material objects.
 '''
 
 
+import array
+import bisect
 import collections
+import contextlib
+import datetime
+import hashlib
 import importlib
+import itertools
+import pathlib
 import re
-from typing import Dict, List, Optional, Set, Tuple, Union
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+import numpy
 import astropy.units
+from .citation import Citation, citations
 from .refstr import RefStr
 from .quantity import Quantity
+from .formatting import format_values
+from .querycache import query_cache
+from .grouping import GroupBy
+from .formula import _attr_path_unit, attr_path_kind, compile_formula
+from . import interop
+from .validation import Violation, validate
+from .streaming import batches, prefetched_batches
+from .scalar import Scalar, intern_unit
+from .ephemeris import Ephemeris
+from .spatial import SpatialIndex
+from .similarity import SimilarityIndex
 from ..err import TheVerseError
 
 
@@ -36,10 +58,24 @@ class LinkDict(Dict[str, 'Everything']):
     like a frozen dict.
 
     Values can be accessed as attributes.
+
+    Each instance has a generation counter that is incremented whenever
+    objects are linked or unlinked, and whenever objects in it, or objects
+    they link to, are revised or relinked.  Query results (`.filter()`,
+    `.column()`) are cached in the shared `query_cache`, keyed by instance,
+    generation, and query, so that repeated queries on unchanged data are
+    cache hits.
+    Indices derived from the values can be stored in `._cache`; it is
+    cleared whenever the generation changes.
     '''
+    _uids = itertools.count()
+
     def __init__(self, *, registry=False):
         super().__init__()
         self._attr_names = {}
+        self._cache = {}
+        self._uid = next(self._uids)
+        self._generation = 0
         self.registry = registry
 
     def __setitem__(self, key, value):
@@ -68,14 +104,25 @@ class LinkDict(Dict[str, 'Everything']):
                                     f'named "{self._attr_names[name_normalized]}"; names must be unique when lowercased')
         super().__setitem__(name, object)
         self._attr_names[name_normalized] = object.name
+        self._invalidate()
 
     def unlink_object(self, object: 'Everything'):
         if not object.unlinking:
             raise TheVerseError('Can only unlink an object by calling its ".unlink()" method')
-        try:
+        self._remove(object)
+
+    def _remove(self, object: 'Everything'):
+        # Another object with the same name may have replaced this one (for
+        # example, during a reload), in which case it must not be removed
+        if self.get(object.name) is object:
             super().__delitem__(object.name)
-        except KeyError:
-            pass
+            del self._attr_names[object.name.lower().replace(' ', '_')]
+            self._invalidate()
+
+    def __reduce__(self):
+        # Only the objects are pickled.  Unpickled instances are never
+        # registries, since they do not belong to a universe.
+        return (_linkdict_from_objects, (list(self.values()),))
 
     def __getattr__(self, attr):
         try:
@@ -84,6 +131,405 @@ class LinkDict(Dict[str, 'Everything']):
             raise KeyError(attr)
         return self[key]
 
+    @property
+    def generation(self):
+        return self._generation
+
+    def _invalidate(self):
+        '''
+        Start a new generation, so that cached query results and indices are
+        no longer used.  This is needed whenever objects are linked or
+        unlinked, or when linked objects are replaced.
+        '''
+        self._generation += 1
+        self._cache.clear()
+
+    def cached(self, query: Hashable, compute: Callable[[], Any]) -> Any:
+        '''
+        Return the cached result of `query` for the current generation,
+        calling `compute()` to create it if needed.  Results are shared, so
+        they must be treated as immutable.
+        '''
+        return query_cache.get((self._uid, self._generation, query), compute)
+
+    def filter(self, predicate: Optional[Callable[['Everything'], bool]]=None, **criteria) -> 'FrozenLinkDict':
+        '''
+        Objects for which `predicate(object)` is true and whose attributes
+        equal all keyword `criteria`, as a `FrozenLinkDict`.
+
+        Results are cached, with the predicate function itself as part of the
+        key.  To benefit from caching, define a predicate once and reuse it,
+        rather than creating a new lambda for each query.  Criteria values
+        must be hashable.
+        '''
+        if predicate is not None and not callable(predicate):
+            raise TypeError
+        criteria_key = tuple(sorted(criteria.items()))
+        def compute():
+            objects = {}
+            for name, obj in self.items():
+                if predicate is not None and not predicate(obj):
+                    continue
+                if criteria and not all(getattr(obj, k, _missing) == v for k, v in criteria_key):
+                    continue
+                objects[name] = obj
+            return FrozenLinkDict(objects)
+        return self.cached(('filter', predicate, criteria_key), compute)
+
+    def column(self, attr: str) -> Union[astropy.units.Quantity, numpy.ndarray]:
+        '''
+        Values of an attribute for all objects, in order, as a single
+        read-only array.  `attr` may be a dotted path through links (for
+        example, `'primary.mass'`).  Attribute fallbacks are respected.
+
+        Quantities give a `Quantity` array in SI units, with NaN for objects
+        that lack the attribute.  Links give an object array of the names of
+        linked objects, and strings give an object array of strings.  Missing
+        links and strings are `None`.
+        '''
+        return self.cached(('column', attr), lambda: _column(self.values(), attr))
+
+    def format_column(self, attr: str, *, names: bool=False, **kwargs) -> List[Optional[str]]:
+        '''
+        Format the values of a quantity attribute for all objects in one
+        pass, as a list of strings (`None` for missing values).  With
+        `names=True`, strings are prefixed with the quantity name set via
+        `_attr_quant_names`.  Other keyword arguments are passed to
+        `formatting.format_values()` (`sig_figs`, `style`, `notation`).
+        Results are cached.
+        '''
+        def compute():
+            column = self.column(attr)
+            if not isinstance(column, astropy.units.Quantity):
+                raise TheVerseError(f'Attribute "{attr}" is not a quantity')
+            name = None
+            if names:
+                for quant in _column_objects(self.values(), attr):
+                    if quant is not None:
+                        name = quant.name
+                        break
+            return tuple(format_values(column.value, column.unit, name=name, **kwargs))
+        return list(self.cached(('format_column', attr, names, tuple(sorted(kwargs.items()))), compute))
+
+    def evaluate(self, formula: str, unit: Optional[Union[str, astropy.units.UnitBase]]=None) -> astropy.units.Quantity:
+        '''
+        Evaluate a formula such as `'G * mass / radius**2'` for all objects,
+        in order, as a read-only `Quantity` array in `unit` (by default, the
+        unit that the formula gives).  Objects that lack an attribute give
+        NaN.  See `formula` for the names and functions that may be used.
+
+        The formula is parsed and unit-checked once for the class of the
+        objects, and compiled to a NumPy expression over cached columns.
+        Compiled formulas and results are cached.
+        '''
+        if unit is not None:
+            unit = astropy.units.Unit(unit)
+        def compute():
+            classes = {type(obj) for obj in self.values()}
+            if len(classes) > 1:
+                raise TheVerseError('Formulas can only be evaluated for objects of a single class')
+            if not classes:
+                return astropy.units.Quantity(numpy.empty(0), unit, copy=False)
+            compiled = compile_formula(classes.pop(), formula)
+            columns = [self.column(path) for path in compiled.columns]
+            return compiled.evaluate(columns, len(self), unit)
+        return self.cached(('evaluate', formula, unit), compute)
+
+    def _export_columns(self, attrs: Optional[List[str]]) -> List[interop.Column]:
+        objects = list(self.values())
+        references = attrs is None
+        stored_attrs = set()
+        classes = {type(obj) for obj in objects}
+        cls = next(iter(classes)) if len(classes) == 1 else None
+        if attrs is None:
+            if len(classes) > 1:
+                raise TheVerseError('Collections with objects of more than one class can only be exported with "attrs"')
+            attrs = []
+            if cls is not None:
+                # Only stored values are exported, so that importing the
+                # result does not store values obtained from fallbacks (for
+                # example, `radius` from `equatorial_radius`)
+                for attr in cls._schema_attrs():
+                    if attr not in cls._attr_fallbacks:
+                        attrs.append(attr)
+                    elif any(attr in obj.__dict__ for obj in objects):
+                        attrs.append(attr)
+                        stored_attrs.add(attr)
+        columns = []
+        for attr in attrs:
+            if attr in stored_attrs:
+                column = self.cached(('stored_column', attr),
+                                     lambda: _column_from_values([obj.__dict__.get(attr) for obj in objects], attr,
+                                                                 _schema_unit(objects, attr)))
+            else:
+                column = self.column(attr)
+            kind = None if cls is None else attr_path_kind(cls, attr)
+            if isinstance(column, astropy.units.Quantity):
+                columns.append((attr, 'quantity', column.value, column.unit))
+            elif kind == 'link' or (kind is None and any(isinstance(x, Everything)
+                                                         for x in _column_objects(objects, attr))):
+                columns.append((attr, 'link', column, None))
+            else:
+                columns.append((attr, 'string', column, None))
+        if references:
+            columns.append(('reference', 'category', [obj.reference for obj in objects], None))
+            columns.append(('reference_url', 'category', [obj.reference_url for obj in objects], None))
+        return columns
+
+    def to_pandas(self, attrs: Optional[List[str]]=None):
+        '''
+        Convert to a pandas `DataFrame` indexed by name.  By default, columns
+        are all stored attributes of the objects' class plus `reference` and
+        `reference_url`, with only stored values for attributes that can
+        also be obtained from fallbacks (such as `radius`), so that the
+        result can be imported again; otherwise, they are `attrs`, which may
+        be dotted paths.  Quantity columns are SI floats built from the cached
+        read-only columns, with units in `.attrs['units']`, and links are
+        categorical columns of names.  See `interop`.
+        '''
+        return interop.to_pandas(self.column('name'), self._export_columns(attrs))
+
+    def to_arrow(self, attrs: Optional[List[str]]=None):
+        '''
+        Convert to an Arrow `Table`, with a `name` column followed by the
+        same columns as `.to_pandas()`.  Quantity columns wrap the cached
+        column buffers without copying, with units as `unit` field metadata,
+        and links are dictionary-encoded.
+        '''
+        return interop.to_arrow(self.column('name'), self._export_columns(attrs))
+
+    def validate(self, *, processes: Optional[int]=None, shard_size: int=100_000) -> List[Violation]:
+        '''
+        Check all objects against the `_attr_rules` of their class, with
+        vectorized checks over cached columns.  Returns a list of
+        `Violation` records.  See `validation.validate()` for `processes`
+        and `shard_size`.
+        '''
+        collection_name = next(iter(self.values()))._link_collection_name if self else ''
+        return validate({collection_name: self}, processes=processes, shard_size=shard_size)
+
+    def similarity_index(self, attrs: List[str]) -> SimilarityIndex:
+        '''
+        Index of objects in a log-scaled, normalized space of quantity
+        attributes `attrs`.  It is built on first use and rebuilt after
+        objects are linked or unlinked.
+        '''
+        key = ('similarity_index', tuple(attrs))
+        try:
+            return self._cache[key]
+        except KeyError:
+            index = SimilarityIndex(list(self.values()), attrs, [self.column(attr) for attr in attrs])
+            self._cache[key] = index
+            return index
+
+    def most_similar(self, target: Union['Everything', Mapping[str, Any]], k: int=5,
+                     attrs: Optional[List[str]]=None) -> List[Tuple['Everything', float]]:
+        '''
+        The `k` objects most similar to `target`, as a list of `(object,
+        distance)` tuples sorted by distance.  Distances are in standard
+        deviations of log-scaled attributes (see `SimilarityIndex`).
+
+        `target` is either an object, which is excluded from results, or a
+        dict mapping attributes to values (quantities, strings such as
+        `"2 earthMass"`, or floats in SI units).  `attrs` are the quantity
+        attributes to compare; they default to the keys of a dict target, or
+        to all quantity attributes that an object target has.  Only objects
+        that have all `attrs` are compared.
+        '''
+        if isinstance(target, Everything):
+            if attrs is None:
+                attrs = [k for k in target._attr_units if k in target.__dict__]
+            return self.similarity_index(attrs).most_similar(target, k)
+        if not isinstance(target, Mapping):
+            raise TypeError
+        if attrs is None:
+            attrs = list(target)
+        return self.similarity_index(attrs).query(target, k)
+
+    def group_by(self, attr: str) -> GroupBy:
+        '''
+        Group objects by the values of an attribute, for aggregation with
+        `.agg()`.  `attr` may be a dotted path through links (for example,
+        `'primary'` or `'primary.spectral_type'`).  Attribute fallbacks are
+        respected.  Grouping is computed from the cached column and is
+        itself cached.
+        '''
+        return GroupBy(self, attr)
+
+    def _sample_indices(self, n: int, rng: numpy.random.Generator, replace: bool) -> numpy.ndarray:
+        return _random_indices(len(self), n, rng, replace)
+
+    def sample(self, n: int, *,
+               seed: Optional[Union[int, numpy.random.Generator]]=None,
+               replace: bool=False) -> List['Everything']:
+        '''
+        Random sample of `n` objects.  `seed` may be an integer seed or a
+        NumPy `Generator`.
+        '''
+        if isinstance(seed, numpy.random.Generator):
+            rng = seed
+        else:
+            rng = numpy.random.default_rng(seed)
+        objects = list(self.values())
+        return [objects[i] for i in self._sample_indices(n, rng, replace)]
+
+    def stream(self, batch_size: int=4096, attrs: Optional[List[str]]=None, *,
+               seed: Optional[Union[int, numpy.random.Generator]]=None,
+               replace: bool=True,
+               prefetch: int=0) -> Iterator[Dict[str, Union[numpy.ndarray, astropy.units.Quantity]]]:
+        '''
+        Endless stream of random batches of `batch_size` objects.  Each batch
+        is a dict that maps `"name"` and each attribute in `attrs` to an array
+        of values (as from `.column()`), so that no objects or lists of
+        objects are created.  Each batch is sampled independently, without
+        replacement within the batch if `replace=False`.
+
+        Columns are taken when the stream is created, and batches are
+        sampled from them even if objects are later linked or unlinked.
+        With `prefetch > 0`, up to that many batches are created ahead on a
+        background thread, which waits while they are unused.
+        '''
+        if not isinstance(batch_size, int):
+            raise TypeError
+        if batch_size < 1:
+            raise ValueError('"batch_size" must be at least 1')
+        if not isinstance(prefetch, int):
+            raise TypeError
+        if prefetch < 0:
+            raise ValueError('"prefetch" cannot be negative')
+        if len(self) == 0:
+            raise TheVerseError('Cannot sample from an empty collection')
+        if not replace and batch_size > len(self):
+            raise TheVerseError(f'Cannot sample {batch_size} objects without replacement from {len(self)} objects')
+        if isinstance(seed, numpy.random.Generator):
+            rng = seed
+        else:
+            rng = numpy.random.default_rng(seed)
+        if attrs is None:
+            attrs = []
+        columns = {'name': self.column('name')}
+        for attr in attrs:
+            columns[attr] = self.column(attr)
+        # Batches are sampled from the columns as they were taken, even if
+        # the collection changes later
+        size = len(columns['name'])
+        def make_batch():
+            indices = _random_indices(size, batch_size, rng, replace)
+            return {k: v[indices] for k, v in columns.items()}
+        if prefetch:
+            return prefetched_batches(make_batch, prefetch)
+        return batches(make_batch)
+
+
+_missing = object()
+
+
+def _random_indices(size: int, n: int, rng: numpy.random.Generator, replace: bool) -> numpy.ndarray:
+    '''
+    Random sample of `n` indices into a sequence of length `size`.
+    '''
+    if not isinstance(n, int):
+        raise TypeError
+    if n < 0:
+        raise ValueError('Sample size cannot be negative')
+    if not replace and n > size:
+        raise TheVerseError(f'Cannot sample {n} objects without replacement from {size} objects')
+    if size == 0:
+        if n > 0:
+            raise TheVerseError('Cannot sample from an empty collection')
+        return numpy.empty(0, dtype=int)
+    return rng.choice(size, size=n, replace=replace)
+
+
+def _column_objects(objects, attr: str) -> list:
+    path = attr.split('.')
+    values = []
+    for obj in objects:
+        value = obj
+        for part in path:
+            value = getattr(value, part, None)
+            if value is None:
+                break
+        values.append(value)
+    return values
+
+
+def _schema_unit(objects, attr: str) -> Optional[astropy.units.UnitBase]:
+    '''
+    Unit of a quantity attribute according to the schema of the objects'
+    class, or `None` if the objects are not all of one class or the
+    attribute is not a quantity.
+    '''
+    classes = {type(obj) for obj in objects}
+    if len(classes) != 1:
+        return None
+    cls = classes.pop()
+    if attr_path_kind(cls, attr) != 'quantity':
+        return None
+    return _attr_path_unit(cls, attr)
+
+
+def _column(objects, attr: str) -> Union[astropy.units.Quantity, numpy.ndarray]:
+    return _column_from_values(_column_objects(objects, attr), attr, _schema_unit(objects, attr))
+
+
+def _column_from_values(values: list, attr: str,
+                        schema_unit: Optional[astropy.units.UnitBase]=None) -> Union[astropy.units.Quantity, numpy.ndarray]:
+    # Quantity attributes that no object has are still quantities
+    unit = schema_unit
+    for value in values:
+        if isinstance(value, astropy.units.Quantity):
+            unit = value.unit
+            break
+    if unit is not None:
+        try:
+            array = numpy.array([numpy.nan if v is None else v.to_value(unit) for v in values], dtype=float)
+        except (AttributeError, astropy.units.UnitsError):
+            raise TheVerseError(f'Attribute "{attr}" does not have consistent units')
+        array.flags.writeable = False
+        return astropy.units.Quantity(array, unit, copy=False)
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = [v.name if isinstance(v, Everything) else v for v in values]
+    array.flags.writeable = False
+    return array
+
+
+
+
+class FrozenLinkDict(LinkDict):
+    '''
+    Immutable `LinkDict` used by frozen universes.  Objects cannot be linked
+    or unlinked, so that any number of threads can read it concurrently
+    without locks.  It is also used for query results.
+
+    Derived data in `._cache` is still computed on first use;
+    concurrent computation only results in redundant work, since
+    computations are deterministic and each result is stored with a single
+    assignment.
+    '''
+    def __init__(self, objects: Mapping[str, 'Everything'], *, registry=False):
+        super().__init__(registry=registry)
+        dict.update(self, objects)
+        self._attr_names = {k.lower().replace(' ', '_'): k for k in self}
+
+    def link_object(self, object: 'Everything'):
+        raise TheVerseError(f'"{object.name}" ({object.__class__.__name__}) cannot be linked to a frozen collection')
+
+    def unlink_object(self, object: 'Everything'):
+        raise TheVerseError(f'"{object.name}" ({object.__class__.__name__}) cannot be unlinked from a frozen collection')
+
+    def pop(self, key, default=None):
+        raise NotImplementedError
+
+    def popitem(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __reduce__(self):
+        return (FrozenLinkDict, (dict(self),))
+
 
 
 
@@ -99,6 +545,116 @@ def _class_name_to_name_and_collection_name(class_name):
 _attr_re = re.compile(r'^[a-z]+(?:_[a-z]+)*$')
 
 
+def _make_link_proc(k, expected_type, linkdictproc, trusted):
+    if trusted:
+        def proc(self, v):
+            linkdictproc(self, v)
+            setattr(self, k, v)
+            v.link_object(self)
+    else:
+        def proc(self, v):
+            if not isinstance(v, expected_type):
+                raise TypeError
+            linkdictproc(self, v)
+            setattr(self, k, v)
+            v.link_object(self)
+    return proc
+
+def _make_string_value_proc(quant_name):
+    def value_proc(self, v, citation):
+        if isinstance(v, RefStr):
+            pass
+        elif isinstance(v, str):
+            v = RefStr(v, citation=citation)
+        else:
+            raise TypeError
+        v._name = quant_name
+        return v
+    return value_proc
+
+def _make_unit_value_proc(k, expected_unit, quant_name):
+    # Quantities parsed from strings have interned units, so that units can
+    # usually be compared by identity
+    expected_unit = intern_unit(expected_unit)
+    def value_proc(self, v, citation):
+        if isinstance(v, Quantity):
+            quant = v
+        else:
+            quant = Quantity(v, citation=citation)
+        if quant.unit is not expected_unit and quant.unit != expected_unit:
+            raise TypeError(f'Invalid unit for "{self.name}" attribute "{k}"; '
+                            f'expected "{expected_unit}", not "{quant.unit}"')
+        quant._name = quant_name
+        return quant
+    return value_proc
+
+def _make_value_proc(k, value_proc):
+    def proc(self, v):
+        value = value_proc(self, v, self._citation)
+        value.link_object(self)
+        setattr(self, k, value)
+    return proc
+
+def _make_trusted_unit_proc(k, expected_unit, quant_name):
+    expected_unit = intern_unit(expected_unit)
+    def proc(self, v):
+        if isinstance(v, Quantity) and (v.unit is expected_unit or v.unit == expected_unit):
+            quant = v
+            quant._name = quant_name
+        elif isinstance(v, astropy.units.Quantity):
+            # Quantities derived with Astropy (for example, with `.to()`) may
+            # be in non-SI units, and are converted
+            try:
+                value = v.to_value(expected_unit)
+            except astropy.units.UnitConversionError:
+                raise TypeError(f'Invalid unit for "{self.name}" attribute "{k}"; '
+                                f'expected "{expected_unit}", not "{v.unit}"')
+            citation = v.__dict__.get('_citation') or self._citation
+            quant = Quantity._from_trusted(value, expected_unit, quant_name, citation)
+        else:
+            quant = Quantity._from_trusted(v, expected_unit, quant_name, self._citation)
+        quant.link_object(self)
+        setattr(self, k, quant)
+    return proc
+
+def _make_attr_value_procs(cls):
+    '''
+    Create a dispatch table that maps each quantity and string attribute to
+    a function that creates a validated value for it from a raw value and a
+    citation.  These are used both by constructors and for revisions.
+    '''
+    value_procs = {}
+    for k, expected_unit in cls._attr_units.items():
+        quant_name = cls._attr_quant_names.get(k, k.replace('_', ' '))
+        value_procs[k] = _make_unit_value_proc(k, expected_unit, quant_name)
+    for k in cls._attr_strings:
+        quant_name = cls._attr_quant_names.get(k, k.replace('_', ' '))
+        value_procs[k] = _make_string_value_proc(quant_name)
+    return value_procs
+
+def _make_attr_procs(cls, *, trusted):
+    '''
+    Create a dispatch table that maps each keyword argument accepted by a
+    class's constructor to a function that processes it.  Everything that
+    depends only on the class schema (expected types and units, quantity
+    names, link processing methods) is resolved once here rather than for
+    every keyword argument of every instance.
+
+    Links take precedence over strings, which take precedence over units.
+    '''
+    procs = {}
+    for k, value_proc in cls._attr_value_procs.items():
+        if trusted and k in cls._attr_units and k not in cls._attr_strings:
+            quant_name = cls._attr_quant_names.get(k, k.replace('_', ' '))
+            procs[k] = _make_trusted_unit_proc(k, cls._attr_units[k], quant_name)
+        else:
+            procs[k] = _make_value_proc(k, value_proc)
+    for k, expected_type in cls._attr_links.items():
+        linkdictproc = getattr(cls, f'_proc_{k}', cls._linkdictproc)
+        procs[k] = _make_link_proc(k, expected_type, linkdictproc, trusted)
+    return procs
+
+
 class MetaEverything(type):
     '''
     Metaclass for base class.  Performs extensive attribute checking so that
@@ -172,6 +728,16 @@ class MetaEverything(type):
                        for v in _attr_fallbacks.values()):
                 raise TypeError
 
+        try:
+            _attr_rules = attr_dict['_attr_rules']
+        except KeyError:
+            pass
+        else:
+            if not any(isinstance(_attr_rules, t) for t in (list, tuple)):
+                raise TypeError
+            if not all(isinstance(x, str) for x in _attr_rules):
+                raise TypeError
+
         try:
             _attr_quant_names = attr_dict['_attr_quant_names']
         except KeyError:
@@ -183,7 +749,11 @@ class MetaEverything(type):
                        for k, v in _attr_quant_names.items()):
                 raise TypeError
 
-        return super().__new__(cls, name, parents, attr_dict)
+        new_class = super().__new__(cls, name, parents, attr_dict)
+        new_class._attr_value_procs = _make_attr_value_procs(new_class)
+        new_class._attr_procs = _make_attr_procs(new_class, trusted=False)
+        new_class._attr_trusted_procs = _make_attr_procs(new_class, trusted=True)
+        return new_class
 
 
 class Everything(object, metaclass=MetaEverything):
@@ -203,6 +773,17 @@ class Everything(object, metaclass=MetaEverything):
     _attr_fallbacks: Dict[str, Union[str, List[str], Set[str], Tuple[str]]] = {}
     # Map attribute names to optional alternate names used by quantities
     _attr_quant_names: Dict[str, str] = {}
+    # List rules that relate attributes, such as `'polar_radius <=
+    # equatorial_radius'`, for `validate()`
+    _attr_rules: Union[List[str], Tuple[str]] = []
+
+    # Bookkeeping for linking and unlinking.  Instances in frozen universes
+    # drop their own values, so that these class-level defaults apply.
+    _links: Optional[list] = None
+    _unlinking: bool = False
+    # Map attribute names to date ordinals and values of revisions, for
+    # instances that have been revised
+    _revisions: Optional[Dict[str, Tuple[array.array, list]]] = None
 
     # Subclasses that are actually instantiated must also implement these:
     #
@@ -213,7 +794,7 @@ class Everything(object, metaclass=MetaEverything):
     #                               collection of instances is used as an
     #                               attribute.
 
-    def __init__(self, name: str, **kwargs):
+    def __init__(self, name: str, *, _trusted: bool=False, **kwargs):
         if type(self) is Everything:
             raise TheVerseError(f'{self.__class__} cannot be instantiated; only subclasses can be used')
 
@@ -223,12 +804,17 @@ class Everything(object, metaclass=MetaEverything):
 
         reference = kwargs.pop('reference', None)
         reference_url = kwargs.pop('reference_url', None)
-        if kwargs and reference is None and reference_url is None:
+        citation = kwargs.pop('citation', None)
+        if citation is not None:
+            if not isinstance(citation, Citation):
+                raise TypeError
+            if reference is not None or reference_url is not None:
+                raise TypeError('"citation" cannot be combined with "reference" or "reference_url"')
+        elif reference is not None or reference_url is not None:
+            citation = citations.intern(reference, reference_url)
+        elif kwargs:
             raise TypeError('At least one of "reference" and "reference_url" must be given')
-        if any(x is not None and not isinstance(x, str) for x in (reference, reference_url)):
-            raise TypeError
-        self._reference: Optional[str] = reference
-        self._reference_url: Optional[str] = reference_url
+        self._citation: Optional[Citation] = citation
 
         # List of all objects that link to this instance.  This allows
         # unlinking, which removes all references from other objects to this
@@ -240,52 +826,73 @@ class Everything(object, metaclass=MetaEverything):
         # `._unlinking == True`.
         self._unlinking = False
 
+        # Dispatch tables are generated for each class by `MetaEverything`
+        if _trusted:
+            attr_procs = self._attr_trusted_procs
+        else:
+            attr_procs = self._attr_procs
         for k, v in kwargs.items():
             try:
-                expected_type = self._attr_links[k]
+                proc = attr_procs[k]
             except KeyError:
-                pass
-            else:
-                if not isinstance(v, expected_type):
-                    raise TypeError
-                getattr(self, f'_proc_{k}', self._linkdictproc)(v)
-                setattr(self, k, v)
-                v.link_object(self)
-                continue
-            if k in self._attr_strings:
-                if isinstance(v, RefStr):
-                    pass
-                elif isinstance(v, str):
-                    v = RefStr(v, reference=self.reference, reference_url=self.reference_url)
-                else:
-                    raise TypeError
-                try:
-                    v._name = self._attr_quant_names[k]
-                except KeyError:
-                    v._name = k.replace('_', ' ')
-                v.link_object(self)
-                setattr(self, k, v)
-                continue
+                raise TypeError(f'Unknown keyword argument "{k}"')
+            proc(self, v)
+
+        for k in self._attr_linkdicts:
+            setattr(self, k, LinkDict())
+
+    def __reduce__(self):
+        '''
+        Pickle as a reference to an object in a universe's dataset when
+        possible (see `Primordial`), and otherwise as a compact record of
+        the object's name, citation, values, and links.  Objects that link
+        to this object and collections it belongs to are not pickled.
+        '''
+        if not getattr(_pickling, 'by_value', False):
+            reference = self._pickle_reference()
+            if reference is not None:
+                return (_object_from_reference, reference)
+        values = {}
+        for k in (*self._attr_units, *self._attr_strings):
             try:
-                expected_unit = self._attr_units[k]
+                values[k] = self.__dict__[k]
             except KeyError:
-                raise TypeError(f'Unknown keyword argument "{k}"')
-            if isinstance(v, Quantity):
-                quant = v
-            else:
-                quant = Quantity(v, reference=self.reference, reference_url=self.reference_url)
-            if quant.unit != expected_unit:
-                raise TypeError(f'Invalid unit for "{self.name}" attribute "{k}"; '
-                                f'expected "{expected_unit}", not "{quat.unit}"')
+                pass
+        links = {}
+        for k in self._attr_links:
             try:
-                quant._name = self._attr_quant_names[k]
+                links[k] = self.__dict__[k]
             except KeyError:
-                quant._name = k.replace('_', ' ')
-            quant.link_object(self)
-            setattr(self, k, quant)
+                pass
+        universe = self.__dict__.get('universe')
+        return (_object_from_record,
+                (self.__class__, self._name, self._citation, values, links, self._revisions,
+                 None if universe is None else universe.name))
 
-        for k in self._attr_linkdicts:
-            setattr(self, k, LinkDict())
+    def _pickle_reference(self) -> Optional[tuple]:
+        return None
+
+    @classmethod
+    def _schema_attrs(cls) -> List[str]:
+        '''
+        All attributes of the class, with links first, then quantities and
+        strings.
+        '''
+        attrs = {}
+        for k in (*cls._attr_links, *cls._attr_units, *cls._attr_strings):
+            attrs[k] = None
+        return list(attrs)
+
+    @classmethod
+    def from_trusted(cls, name: str, **kwargs):
+        '''
+        Create an instance from data that has already been validated, such
+        as data exported from another instance.  Values for attributes with
+        units must be `Quantity` instances or floats that are already in the
+        expected SI units, and links must be objects rather than names.
+        Minimal type and unit checking is performed.
+        '''
+        return cls(name, _trusted=True, **kwargs)
 
     def __getattr__(self, attr):
         # No need to check for invalid alias keys; that is done in
@@ -311,6 +918,152 @@ class Everything(object, metaclass=MetaEverything):
                 return val
         raise AttributeError(f'{self.__class__} has no attribute {repr(attr)}')
 
+    def scalar(self, attr: str) -> Scalar:
+        '''
+        Compact `Scalar` version of a quantity attribute, for fast arithmetic.
+        Attribute fallbacks are respected.
+        '''
+        quant = getattr(self, attr)
+        if not isinstance(quant, Quantity):
+            raise TheVerseError(f'"{self.name}" attribute "{attr}" is not a quantity')
+        return quant.to_scalar()
+
+    @staticmethod
+    def _value_ordinal(value) -> int:
+        # Undated values are treated as always having existed
+        citation = value.citation
+        if citation is None or citation.date is None:
+            return datetime.date.min.toordinal()
+        return citation.date.toordinal()
+
+    def revise(self, *, date: Optional[Union[str, datetime.date]]=None,
+               reference: Optional[str]=None, reference_url: Optional[str]=None,
+               citation: Optional[Citation]=None, **kwargs):
+        '''
+        Add dated revisions of quantity and string attributes, for example
+        when a new measurement is published.  Previous values are kept, so
+        that the object can still be viewed as of an earlier date with
+        `.as_of()` or `Universe.as_of()`.
+
+        The date of the revision defaults to the date of its citation.  If a
+        revision is the latest for its attribute, it becomes the current
+        value.
+        '''
+        if self._links is None:
+            raise TheVerseError(f'"{self.name}" ({self.__class__.__name__}) is frozen and cannot be revised')
+        if not kwargs:
+            raise TypeError('No attributes to revise')
+        if citation is not None:
+            if not isinstance(citation, Citation):
+                raise TypeError
+            if reference is not None or reference_url is not None:
+                raise TypeError('"citation" cannot be combined with "reference" or "reference_url"')
+        elif reference is not None or reference_url is not None:
+            citation = citations.intern(reference, reference_url)
+        else:
+            raise TypeError('At least one of "reference" and "reference_url" must be given')
+        if date is None:
+            date = citation.date
+            if date is None:
+                raise TheVerseError(f'Revision of "{self.name}" needs a "date", since its citation has none')
+        else:
+            from .revisions import parse_date
+            date = parse_date(date)
+        ordinal = date.toordinal()
+
+        values = {}
+        for k, v in kwargs.items():
+            try:
+                value_proc = self._attr_value_procs[k]
+            except KeyError:
+                raise TypeError(f'Cannot revise "{k}"; only quantity and string attributes have revisions')
+            values[k] = value_proc(self, v, citation)
+        if self._revisions is None:
+            self._revisions = {}
+        for k, value in values.items():
+            try:
+                ordinals, revision_values = self._revisions[k]
+            except KeyError:
+                ordinals, revision_values = array.array('l'), []
+                try:
+                    current = self.__dict__[k]
+                except KeyError:
+                    pass
+                else:
+                    ordinals.append(self._value_ordinal(current))
+                    revision_values.append(current)
+                self._revisions[k] = (ordinals, revision_values)
+            index = bisect.bisect_right(ordinals, ordinal)
+            ordinals.insert(index, ordinal)
+            revision_values.insert(index, value)
+            value.link_object(self)
+            if index == len(ordinals) - 1:
+                setattr(self, k, value)
+        self._invalidate_collections()
+
+    def _invalidate_collections(self):
+        '''
+        Invalidate the cached data of all collections that contain this
+        object, or that contain objects linking to it either directly or
+        through other objects.  Columns of dotted paths (`primary.mass`) and
+        everything derived from them depend on the values of linked objects.
+        '''
+        seen = set()
+        pending = [self]
+        while pending:
+            obj = pending.pop()
+            for x in obj._links or ():
+                if id(x) in seen:
+                    continue
+                seen.add(id(x))
+                if isinstance(x, LinkDict):
+                    x._invalidate()
+                elif isinstance(x, Everything):
+                    pending.append(x)
+
+    def revisions(self, attr: str) -> List[Tuple[datetime.date, Union[Quantity, RefStr]]]:
+        '''
+        Dates and values of all revisions of an attribute, oldest first.
+        Values that were never revised are given with the date of their
+        citation, or `datetime.date.min` if it has none.
+        '''
+        if attr not in self._attr_value_procs:
+            raise TypeError(f'"{attr}" is not a quantity or string attribute')
+        if self._revisions is not None and attr in self._revisions:
+            ordinals, values = self._revisions[attr]
+            return [(datetime.date.fromordinal(o), v) for o, v in zip(ordinals, values)]
+        try:
+            value = self.__dict__[attr]
+        except KeyError:
+            return []
+        return [(datetime.date.fromordinal(self._value_ordinal(value)), value)]
+
+    def _value_as_of(self, attr: str, ordinal: int) -> Union[Quantity, RefStr]:
+        if self._revisions is not None and attr in self._revisions:
+            ordinals, values = self._revisions[attr]
+            index = bisect.bisect_right(ordinals, ordinal)
+            if index > 0:
+                return values[index - 1]
+        else:
+            try:
+                value = self.__dict__[attr]
+            except KeyError:
+                pass
+            else:
+                if self._value_ordinal(value) <= ordinal:
+                    return value
+        raise AttributeError(f'{self.__class__} has no attribute {repr(attr)} as of '
+                             f'{datetime.date.fromordinal(ordinal)}')
+
+    def as_of(self, date: Union[str, datetime.date]):
+        '''
+        View of this object as of a date (`YYYY-MM-DD` or `datetime.date`).
+        Quantity and string attributes give the latest value dated on or
+        before that date, and links give views as of the same date.
+        '''
+        from .revisions import ObjectView, parse_date
+        return ObjectView(self, parse_date(date).toordinal())
+
     def _linkdictproc(self, object: 'Everything'):
         linkdict = getattr(object, self._link_collection_name)
         linkdict.link_object(self)
@@ -320,19 +1073,51 @@ class Everything(object, metaclass=MetaEverything):
     def name(self):
         return self._name
 
+    @property
+    def citation(self):
+        return self._citation
+
+    @property
+    def citations(self):
+        '''
+        Unique citations for this object and all of its values.
+        '''
+        citations = {}
+        if self._citation is not None:
+            citations[self._citation.id] = self._citation
+        for k in (*self._attr_units, *self._attr_strings):
+            try:
+                citation = self.__dict__[k].citation
+            except KeyError:
+                pass
+            else:
+                citations[citation.id] = citation
+        if self._revisions is not None:
+            for ordinals, values in self._revisions.values():
+                for value in values:
+                    citations[value.citation.id] = value.citation
+        return list(citations.values())
+
     @property
     def reference(self):
-        return self._reference
+        if self._citation is None:
+            return None
+        return self._citation.reference
 
     @property
     def reference_url(self):
-        return self._reference_url
+        if self._citation is None:
+            return None
+        return self._citation.reference_url
 
     @property
     def unlinking(self):
         return self._unlinking
 
     def link_object(self, object: Union[LinkDict, 'Everything']):
+        if self._links is None:
+            raise TheVerseError(f'"{object.name}" ({object.__class__.__name__}) cannot be linked to '
+                                f'frozen "{self.name}" ({self.__class__.__name__})')
         self._links.append(object)
 
     def unlink_object(self, object: 'Everything'):
@@ -353,15 +1138,51 @@ class Everything(object, metaclass=MetaEverything):
         this instance does not exist as far as they are concerned.  Also
         remove all references from Quantity attributes.
         '''
+        if self._links is None:
+            raise TheVerseError(f'"{self.name}" ({self.__class__.__name__}) is frozen and cannot be unlinked')
         self._unlinking = True
         for x in self._links:
             x.unlink_object(self)
+        for k in self._attr_links:
+            try:
+                target = self.__dict__[k]
+            except KeyError:
+                pass
+            else:
+                target._links = [x for x in target._links if x is not self]
+        for k in (*self._attr_units, *self._attr_strings):
+            try:
+                self.__dict__[k].unlink_object(self)
+            except KeyError:
+                pass
+        if self._revisions is not None:
+            for ordinals, values in self._revisions.values():
+                for value in values:
+                    value.unlink_object(self)
         self._unlinking = False
         self._links = []
 
 
 
 
+def _module_source_stamp(module, stamp: Optional[Tuple[int, int, str]]=None) -> Optional[Tuple[int, int, str]]:
+    '''
+    Modification time, size, and hash of a module's source, for detecting
+    changes.  If a previous `stamp` is given and the modification time and
+    size are unchanged, it is returned without hashing the source.  Returns
+    `None` if the source is not available as a file.
+    '''
+    try:
+        path = pathlib.Path(module.__file__)
+        stat = path.stat()
+        if stamp is not None and stamp[:2] == (stat.st_mtime_ns, stat.st_size):
+            return stamp
+        source = path.read_bytes()
+    except (AttributeError, TypeError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size, hashlib.sha256(source).hexdigest())
+
+
 class Universe(Everything):
     _universes: LinkDict = LinkDict(registry=True)
     default_name = 'Universe'
@@ -370,23 +1191,270 @@ class Universe(Everything):
         super().__init__(name, **kwargs)
         self.universes.link_object(self)
         self._links.append(self.universes)
+        # Map link collection names to the data modules that were loaded for
+        # them and the source stamps of the modules when they were loaded
+        self._data_modules: Dict[str, Tuple[str, Optional[Tuple[int, int, str]]]] = {}
+        # Registries that are being loaded during a reload.  Objects are
+        # registered here until loading is complete, so that the current
+        # registry remains visible in the meantime.
+        self._staging_registries: Dict[str, LinkDict] = {}
+        # Names of the objects that were created by each data module, which
+        # can be pickled as references
+        self._data_module_names: Dict[str, frozenset] = {}
+        self._reload_lock = threading.RLock()
+        self._frozen = False
 
     def __getattr__(self, attr):
         if attr in Primordial.link_collection_name_to_module_names_registry:
             for link_collection_name in Primordial.link_collection_name_to_module_names_registry[attr]:
                 linkdict = LinkDict(registry=True)
                 setattr(self, f'_{link_collection_name}', linkdict)
+                module_name = f'theverse.data.{self._link_name}.{link_collection_name}'
                 try:
-                    importlib.import_module(f'.data.{self._link_name}.{link_collection_name}', 'theverse')
+                    module = importlib.import_module(module_name)
                 except ImportError:
                     pass
+                else:
+                    self._data_modules[link_collection_name] = (module_name, _module_source_stamp(module))
+                    self._data_module_names[link_collection_name] = frozenset(self.__dict__[f'_{link_collection_name}'])
             return getattr(self, attr)
         raise AttributeError(f'{self.__class__} has no attribute {repr(attr)}')
 
+    def _registry(self, link_collection_name: str) -> LinkDict:
+        '''
+        Registry in which objects are currently being registered, which is
+        the staging registry during a reload.
+        '''
+        try:
+            return self._staging_registries[link_collection_name]
+        except KeyError:
+            return getattr(self, link_collection_name)
+
+    def __reduce__(self):
+        return (_universe_from_name, (self.name,))
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def as_of(self, date: Union[str, datetime.date]):
+        '''
+        View of the universe as of a date (`YYYY-MM-DD` or `datetime.date`),
+        for reproducing results computed with the data available then.
+        Collections are views of the current collections, and attributes of
+        objects resolve to the latest revision dated on or before `date`.
+        Nothing is copied.
+        '''
+        from .revisions import UniverseView, parse_date
+        return UniverseView(self, parse_date(date).toordinal())
+
+    def freeze(self) -> 'Universe':
+        '''
+        Make the universe read-only once loading is finished, so that it can
+        be shared by any number of threads without locks.
+
+        All collections are loaded, and the whole graph of objects is checked
+        for consistency once.  Then all registries and other collections of
+        objects are replaced with `FrozenLinkDict` instances, and objects
+        drop the state that is only needed for linking and unlinking (their
+        lists of linking objects).
+
+        After this, objects can no longer be created in, linked to, unlinked
+        from, or revised in the universe, and it can no longer be reloaded.
+        Everything that is read is unchanged:  values, revisions, links, the
+        contents of collections, the objects of values (`.object`), and
+        provenance queries (`Citation.values`, `Citation.objects`, and
+        `citations.values_from()`).
+        '''
+        with self._reload_lock:
+            if self._frozen:
+                return self
+            registries = {}
+            for attr in Primordial.link_collection_name_to_module_names_registry:
+                registries[attr[1:]] = getattr(self, attr[1:])
+            problems = self._check_consistency(registries)
+            if problems:
+                raise TheVerseError(f'Universe "{self.name}" cannot be frozen:\n' + '\n'.join(problems))
+
+            for link_collection_name, registry in registries.items():
+                setattr(self, f'_{link_collection_name}', FrozenLinkDict(registry, registry=True))
+                for obj in registry.values():
+                    for k in obj._attr_linkdicts:
+                        setattr(obj, k, FrozenLinkDict(obj.__dict__[k]))
+                    del obj._links
+                    del obj._unlinking
+            self._frozen = True
+            return self
+
+    def validate(self, *, processes: Optional[int]=None, shard_size: int=100_000) -> List[Violation]:
+        '''
+        Check all collections against the `_attr_rules` of their classes.
+        Returns a list of `Violation` records.  See `LinkDict.validate()`.
+        '''
+        collections = {}
+        for attr in Primordial.link_collection_name_to_module_names_registry:
+            collections[attr[1:]] = getattr(self, attr[1:])
+        return validate(collections, processes=processes, shard_size=shard_size)
+
+    def _check_consistency(self, registries: Dict[str, LinkDict]) -> List[str]:
+        '''
+        Check the consistency of all objects in the universe.  Returns a list
+        of problems.
+        '''
+        problems = []
+        def is_registered(obj):
+            try:
+                registry = registries[obj._link_collection_name]
+            except KeyError:
+                return False
+            return registry.get(obj.name) is obj
+        for link_collection_name, registry in registries.items():
+            for name, obj in registry.items():
+                desc = f'"{name}" ({obj.__class__.__name__})'
+                if obj.universe is not self:
+                    problems.append(f'{desc} belongs to universe "{obj.universe.name}"')
+                for k in obj._attr_links:
+                    target = obj.__dict__.get(k)
+                    if target is not None and not is_registered(target):
+                        problems.append(f'{desc} attribute "{k}" links to unregistered "{target.name}"')
+                for k in obj._attr_linkdicts:
+                    for linked_name, linked_obj in obj.__dict__[k].items():
+                        if not is_registered(linked_obj):
+                            problems.append(f'{desc} attribute "{k}" contains unregistered "{linked_name}"')
+                        elif not any(linked_obj.__dict__.get(j) is obj for j in linked_obj._attr_links):
+                            problems.append(f'{desc} attribute "{k}" contains "{linked_name}", '
+                                            f'which does not link back')
+                for k, expected_unit in obj._attr_units.items():
+                    quant = obj.__dict__.get(k)
+                    if quant is None:
+                        continue
+                    if quant.unit != expected_unit:
+                        problems.append(f'{desc} attribute "{k}" has unit "{quant.unit}", '
+                                        f'not "{expected_unit}"')
+                    if quant.object is not obj:
+                        problems.append(f'{desc} attribute "{k}" is not linked to the object')
+        return problems
+
+    def changed_data_modules(self) -> List[str]:
+        '''
+        Link collection names whose data modules have changed since they were
+        loaded.
+        '''
+        changed = []
+        for link_collection_name, (module_name, stamp) in self._data_modules.items():
+            if stamp is None:
+                continue
+            new_stamp = _module_source_stamp(sys.modules[module_name], stamp)
+            if new_stamp is None or new_stamp[2] == stamp[2]:
+                continue
+            changed.append(link_collection_name)
+        return changed
+
+    def reload(self) -> List[str]:
+        '''
+        Reload data modules that have changed since they were loaded, so that
+        data corrections take effect without restarting.  Only collections
+        with changed modules are reloaded; other collections and their
+        caches are untouched.  Returns the names of reloaded collections.
+
+        Each changed module is run again with a new, staging registry.  Once
+        it has run successfully, the registry replaces the current registry
+        in a single assignment.  Objects in other collections that link to
+        replaced objects are relinked to the replacements with the same
+        names, and then the replaced objects are unlinked.  If a module fails
+        to run, all objects it created are unlinked, the replaced objects are
+        restored, and the error is raised.
+        '''
+        with self._reload_lock:
+            if self._frozen:
+                raise TheVerseError(f'Universe "{self.name}" is frozen and cannot be reloaded')
+            changed = self.changed_data_modules()
+            for link_collection_name in changed:
+                self._reload_data_module(link_collection_name)
+            return changed
+
+    def _reload_data_module(self, link_collection_name: str):
+        module_name, _ = self._data_modules[link_collection_name]
+        module = sys.modules[module_name]
+        old_registry = getattr(self, link_collection_name)
+        new_registry = LinkDict(registry=True)
+        self._staging_registries[link_collection_name] = new_registry
+        try:
+            module = importlib.reload(module)
+        except BaseException:
+            for new_obj in list(new_registry.values()):
+                new_obj.unlink()
+            for old_obj in old_registry.values():
+                for x in old_obj._links:
+                    if isinstance(x, LinkDict) and x is not old_registry:
+                        x.link_object(old_obj)
+            raise
+        finally:
+            del self._staging_registries[link_collection_name]
+        setattr(self, f'_{link_collection_name}', new_registry)
+        self._data_modules[link_collection_name] = (module_name, _module_source_stamp(module))
+        self._data_module_names[link_collection_name] = frozenset(new_registry)
+
+        for old_obj in old_registry.values():
+            new_obj = new_registry.get(old_obj.name)
+            if new_obj is None:
+                continue
+            for dependent in old_obj._links:
+                if not isinstance(dependent, Everything) or old_registry.get(dependent.name) is dependent:
+                    continue
+                self._relink(dependent, old_obj, new_obj)
+                # Data derived from collections that reach the dependent may
+                # depend on the replaced object
+                dependent._invalidate_collections()
+        for old_obj in list(old_registry.values()):
+            old_obj.unlink()
+
+    @staticmethod
+    def _relink(dependent: 'Everything', old_obj: 'Everything', new_obj: 'Everything'):
+        '''
+        Replace links from `dependent` to `old_obj` with links to `new_obj`.
+        '''
+        old_obj._links = [x for x in old_obj._links if x is not dependent]
+        old_linkdict = old_obj.__dict__.get(dependent._link_collection_name)
+        if old_linkdict is not None:
+            old_linkdict._remove(dependent)
+            dependent._links = [x for x in dependent._links if x is not old_linkdict]
+        for k in dependent._attr_links:
+            if dependent.__dict__.get(k) is old_obj:
+                dependent._attr_trusted_procs[k](dependent, new_obj)
+
     @property
     def universes(self):
         return self._universes
 
+    def spatial_index(self, cls) -> SpatialIndex:
+        '''
+        Spatial index over the positions of all instances of a class (for
+        example, `Star`) in the universe.  It is built on first use and
+        rebuilt after instances are linked or unlinked.
+        '''
+        registry = getattr(self, cls._link_collection_name)
+        try:
+            return registry._cache['spatial_index']
+        except KeyError:
+            index = SpatialIndex(registry.values())
+            registry._cache['spatial_index'] = index
+            return index
+
+    def ephemeris(self, cls) -> Ephemeris:
+        '''
+        Keplerian ephemeris for all instances of a class (for example,
+        `Planet`) in the universe that have orbital elements.  It is built on
+        first use and rebuilt after instances are linked or unlinked.
+        '''
+        registry = getattr(self, cls._link_collection_name)
+        try:
+            return registry._cache['ephemeris']
+        except KeyError:
+            ephemeris = Ephemeris(registry.values())
+            registry._cache['ephemeris'] = ephemeris
+            return ephemeris
+
 
 
 
@@ -409,7 +1477,7 @@ class Primordial(Everything, metaclass=MetaPrimordial):
     '''
     Base class for everything within a universe.
     '''
-    def __init__(self, name, **kwargs):
+    def __init__(self, name, *, _trusted: bool=False, **kwargs):
         if type(self) is Primordial:
             raise TheVerseError(f'{self.__class__} cannot be instantiated; only subclasses can be used')
 
@@ -421,17 +1489,243 @@ class Primordial(Everything, metaclass=MetaPrimordial):
                 raise TheVerseError(f'Universe "{universe}" does not exist')
         elif not isinstance(universe, Universe):
             raise TypeError
+        if universe.frozen:
+            raise TheVerseError(f'Universe "{universe.name}" is frozen; objects cannot be added')
         self.universe = universe
-        registry = getattr(universe, self._link_collection_name)
-        for k, v in kwargs.items():
-            if k in self._attr_links and isinstance(v, str):
-                try:
-                    obj_cls = self._attr_links[k]
-                    obj_registry = getattr(universe, obj_cls._link_collection_name)
-                    obj = obj_registry[v]
-                except KeyError:
-                    raise TheVerseError(f'"{v}" ({v.__class__.__name__}) does not exist in universe "{universe.name}"')
-                kwargs[k] = obj
-        super().__init__(name, **kwargs)
+        registry = universe._registry(self._link_collection_name)
+        # Trusted links are already objects
+        if not _trusted:
+            for k, v in kwargs.items():
+                if k in self._attr_links and isinstance(v, str):
+                    try:
+                        obj_cls = self._attr_links[k]
+                        obj_registry = universe._registry(obj_cls._link_collection_name)
+                        obj = obj_registry[v]
+                    except KeyError:
+                        raise TheVerseError(f'"{v}" ({v.__class__.__name__}) does not exist in universe "{universe.name}"')
+                    kwargs[k] = obj
+        super().__init__(name, _trusted=_trusted, **kwargs)
         registry.link_object(self)
         self._links.append(registry)
+
+    def _pickle_reference(self) -> Optional[tuple]:
+        '''
+        Reference for pickling, if this object was created by a data module
+        of its universe and has not been revised.  The hash of the module's
+        source is included, so that the reference is only resolved by a
+        process with the same dataset.
+        '''
+        universe = self.universe
+        link_collection_name = self._link_collection_name
+        if self._revisions is not None or self._name not in universe._data_module_names.get(link_collection_name, ()):
+            return None
+        if universe._registry(link_collection_name).get(self._name) is not self:
+            return None
+        stamp = universe._data_modules[link_collection_name][1]
+        if stamp is None:
+            return None
+        return (universe.name, link_collection_name, self._name, stamp[2])
+
+    @classmethod
+    def from_pandas(cls, dataframe, *, universe: Union[str, Universe]=Universe.default_name,
+                    reference: Optional[str]=None, reference_url: Optional[str]=None,
+                    citation: Optional[Citation]=None) -> FrozenLinkDict:
+        '''
+        Create objects from the rows of a pandas `DataFrame`, such as one from
+        `LinkDict.to_pandas()`, and return them as a `FrozenLinkDict`.  Names
+        are taken from a `name` column or else the index.  Quantity columns
+        are converted from the units in `.attrs['units']`, or are assumed to
+        be in SI units.  Links are names of objects in `universe`.  Missing
+        values are skipped.  Each row is cited by its `reference` and
+        `reference_url` columns if it has them, and otherwise by the
+        `reference`, `reference_url`, or `citation` arguments.
+        '''
+        names, columns = interop.from_pandas(dataframe)
+        return cls._from_columns(names, columns, universe=universe, reference=reference,
+                                 reference_url=reference_url, citation=citation)
+
+    @classmethod
+    def from_arrow(cls, table, *, universe: Union[str, Universe]=Universe.default_name,
+                   reference: Optional[str]=None, reference_url: Optional[str]=None,
+                   citation: Optional[Citation]=None) -> FrozenLinkDict:
+        '''
+        Create objects from the rows of an Arrow `Table`, such as one from
+        `LinkDict.to_arrow()`.  Units are taken from `unit` field metadata.
+        See `.from_pandas()`.
+        '''
+        names, columns = interop.from_arrow(table)
+        return cls._from_columns(names, columns, universe=universe, reference=reference,
+                                 reference_url=reference_url, citation=citation)
+
+    @classmethod
+    def _from_columns(cls, names: List[str], columns: List[interop.ImportedColumn], *,
+                      universe: Union[str, Universe], reference: Optional[str], reference_url: Optional[str],
+                      citation: Optional[Citation]) -> FrozenLinkDict:
+        if isinstance(universe, str):
+            try:
+                universe = Universe._universes[universe]
+            except KeyError:
+                raise TheVerseError(f'Universe "{universe}" does not exist')
+        elif not isinstance(universe, Universe):
+            raise TypeError
+        if citation is not None:
+            if reference is not None or reference_url is not None:
+                raise TypeError('"citation" cannot be combined with "reference" or "reference_url"')
+        elif reference is not None or reference_url is not None:
+            citation = citations.intern(reference, reference_url)
+
+        # Convert columns to values for trusted construction:  links to
+        # objects and quantities to floats in SI units
+        values_by_attr = []
+        row_references = {}
+        for attr, values, unit in columns:
+            if attr in ('reference', 'reference_url'):
+                row_references[attr] = values
+            elif attr in cls._attr_links:
+                registry = universe._registry(cls._attr_links[attr]._link_collection_name)
+                objects = []
+                for value in values:
+                    if interop._is_missing(value):
+                        objects.append(None)
+                        continue
+                    try:
+                        objects.append(registry[value])
+                    except KeyError:
+                        raise TheVerseError(f'"{value}" does not exist in universe "{universe.name}"')
+                values_by_attr.append((attr, objects))
+            elif attr in cls._attr_strings:
+                values_by_attr.append((attr, values))
+            elif attr in cls._attr_units:
+                if not isinstance(values, numpy.ndarray):
+                    raise TypeError(f'Column "{attr}" must be numeric')
+                if unit is not None:
+                    try:
+                        values = unit.to(cls._attr_units[attr], values)
+                    except astropy.units.UnitsError:
+                        raise TheVerseError(f'Invalid unit for column "{attr}"; expected "{cls._attr_units[attr]}", '
+                                            f'not "{unit}"')
+                values_by_attr.append((attr, numpy.asarray(values, dtype=float).tolist()))
+            else:
+                raise TypeError(f'Unknown column "{attr}"')
+
+        # Check names first, since objects that fail to register would
+        # already be linked to other objects
+        registry = universe._registry(cls._link_collection_name)
+        normalized_names = set()
+        for name in names:
+            if not isinstance(name, str):
+                raise TypeError('Names must be strings')
+            normalized_name = name.lower().replace(' ', '_')
+            if normalized_name in normalized_names or normalized_name in registry._attr_names:
+                raise TheVerseError(f'"{name}" ({cls.__name__}) already exists or conflicts with an existing name')
+            normalized_names.add(normalized_name)
+
+        objects = {}
+        try:
+            for n, name in enumerate(names):
+                kwargs = {}
+                for attr, values in values_by_attr:
+                    value = values[n]
+                    if not interop._is_missing(value):
+                        kwargs[attr] = value
+                row_reference = row_references.get('reference', [None]*len(names))[n]
+                row_reference_url = row_references.get('reference_url', [None]*len(names))[n]
+                if not interop._is_missing(row_reference) or not interop._is_missing(row_reference_url):
+                    kwargs['citation'] = citations.intern(None if interop._is_missing(row_reference) else row_reference,
+                                                          None if interop._is_missing(row_reference_url) else row_reference_url)
+                elif citation is not None:
+                    kwargs['citation'] = citation
+                obj = cls.from_trusted(name, universe=universe, **kwargs)
+                objects[obj.name] = obj
+        except BaseException:
+            # Leave the universe as it was
+            for obj in objects.values():
+                obj.unlink()
+            raise
+        return FrozenLinkDict(objects)
+
+
+
+
+# Pickling.  Objects are reconstructed by these module-level functions.
+
+_pickling = threading.local()
+
+
+@contextlib.contextmanager
+def pickle_by_value():
+    '''
+    Context manager within which objects are pickled as records of their
+    values, even when they could be pickled as references.  This is needed
+    when the receiving process does not have the same dataset.
+    '''
+    previous = getattr(_pickling, 'by_value', False)
+    _pickling.by_value = True
+    try:
+        yield
+    finally:
+        _pickling.by_value = previous
+
+
+def _universe_from_name(name: str) -> Universe:
+    try:
+        return Universe._universes[name]
+    except KeyError:
+        raise TheVerseError(f'Cannot unpickle universe "{name}": it does not exist in this process')
+
+
+def _linkdict_from_objects(objects: List[Everything]) -> LinkDict:
+    linkdict = LinkDict()
+    for obj in objects:
+        linkdict.link_object(obj)
+    return linkdict
+
+
+def _object_from_reference(universe_name: str, link_collection_name: str, name: str, source_hash: str) -> Primordial:
+    universe = _universe_from_name(universe_name)
+    registry = getattr(universe, link_collection_name)
+    try:
+        module_name, stamp = universe._data_modules[link_collection_name]
+    except KeyError:
+        stamp = None
+    if stamp is None or stamp[2] != source_hash:
+        raise TheVerseError(f'Cannot unpickle "{name}": the data for "{link_collection_name}" in universe '
+                            f'"{universe_name}" differs from the data it was pickled with; '
+                            'use "pickle_by_value()" when pickling')
+    try:
+        return registry[name]
+    except KeyError:
+        raise TheVerseError(f'Cannot unpickle "{name}": it does not exist in universe "{universe_name}"')
+
+
+def _object_from_record(cls, name: str, citation: Optional[Citation], values: Dict[str, Any],
+                        links: Dict[str, Everything], revisions: Optional[dict],
+                        universe_name: Optional[str]) -> Everything:
+    '''
+    Reconstruct an object from a record.  The object is detached:  it is not
+    registered in a universe, it is not added to the collections of the
+    objects it links to, and its values are not added to the index of their
+    citations, so that unpickling has no side effects.  The object's
+    `.universe` is the universe with the same name if it exists in this
+    process, and is otherwise left unset.
+    '''
+    obj = cls.__new__(cls)
+    obj._name = name
+    obj._citation = citation
+    obj._links = []
+    obj._unlinking = False
+    if universe_name is not None:
+        universe = Universe._universes.get(universe_name)
+        if universe is not None:
+            obj.universe = universe
+    for value in (*values.values(), *(v for _, vs in (revisions or {}).values() for v in vs)):
+        value._object = obj
+    for k, v in values.items():
+        setattr(obj, k, v)
+    for k, v in links.items():
+        setattr(obj, k, v)
+    if revisions is not None:
+        obj._revisions = revisions
+    for k in obj._attr_linkdicts:
+        setattr(obj, k, LinkDict())
+    return obj
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Interned reference information shared by quantities and objects.
+'''
+
+
+import datetime
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from ..err import TheVerseError
+
+
+
+
+class Citation(object):
+    '''
+    Reference and/or reference URL for a source of values.  Citations are
+    interned by `CitationRegistry.intern()`, so that all values from the
+    same source share a single instance that is identified by a compact
+    integer ID.
+
+    A citation keeps an index of all values (`Quantity` and `RefStr`
+    instances) that cite it and are currently linked to an object.  This
+    makes provenance lookups an index hit rather than a scan of all objects.
+
+    If the reference contains a date in parentheses (for example, `"(02
+    April 2020)"`), it is available as `.date`.  This is the default date of
+    values from the source when attribute revisions are dated.
+    '''
+    __slots__ = ('_id', '_reference', '_reference_url', '_date', '_values')
+
+    _date_re = re.compile(r'\((\d{1,2} [A-Z][a-z]+ \d{4})\)')
+
+    def __init__(self, id: int, reference: Optional[str], reference_url: Optional[str]):
+        self._id = id
+        self._reference = reference
+        self._reference_url = reference_url
+        self._date: Optional[datetime.date] = None
+        if reference is not None:
+            match = self._date_re.search(reference)
+            if match is not None:
+                try:
+                    self._date = datetime.datetime.strptime(match.group(1), '%d %B %Y').date()
+                except ValueError:
+                    pass
+        # Map `id()` of linked values to values.  Values such as `Quantity`
+        # are not hashable, so they cannot be stored in a set.
+        self._values: Dict[int, object] = {}
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} '
+                f'id={self.id} '
+                f'reference={repr(self.reference)} '
+                f'reference_url={repr(self.reference_url)}>')
+
+    def __str__(self):
+        if self.reference is None:
+            return self.reference_url
+        if self.reference_url is None:
+            return self.reference
+        return f'{self.reference} {self.reference_url}'
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def reference(self):
+        return self._reference
+
+    @property
+    def reference_url(self):
+        return self._reference_url
+
+    @property
+    def date(self) -> Optional[datetime.date]:
+        return self._date
+
+    @property
+    def values(self):
+        '''
+        All linked values that cite this source.
+        '''
+        return list(self._values.values())
+
+    @property
+    def objects(self):
+        '''
+        All objects with linked values that cite this source.
+        '''
+        objects = {}
+        for value in self._values.values():
+            objects[id(value.object)] = value.object
+        return list(objects.values())
+
+    def __reduce__(self):
+        # Citations are interned again when unpickled, so that they remain
+        # shared.  Linked values are not pickled.
+        return (_intern_citation, (self._reference, self._reference_url))
+
+    def link_value(self, value):
+        self._values[id(value)] = value
+
+    def unlink_value(self, value):
+        self._values.pop(id(value), None)
+
+
+
+
+class CitationRegistry(object):
+    '''
+    Registry that interns citations, so that each distinct combination of
+    reference and reference URL is only stored once.  Citations can be
+    retrieved by ID (`registry[id]`).
+    '''
+    def __init__(self):
+        self._citations: List[Citation] = []
+        self._citation_keys: Dict[Tuple[Optional[str], Optional[str]], Citation] = {}
+        # Map references and reference URLs to all citations using them
+        self._citation_strings: Dict[str, List[Citation]] = {}
+
+    def __getitem__(self, id: int) -> Citation:
+        return self._citations[id]
+
+    def __iter__(self):
+        return iter(self._citations)
+
+    def __len__(self):
+        return len(self._citations)
+
+    def intern(self, reference: Optional[str]=None, reference_url: Optional[str]=None) -> Citation:
+        if reference is None and reference_url is None:
+            raise TypeError('At least one of "reference" and "reference_url" must be given')
+        if any(x is not None and not isinstance(x, str) for x in (reference, reference_url)):
+            raise TypeError
+        key = (reference, reference_url)
+        try:
+            return self._citation_keys[key]
+        except KeyError:
+            pass
+        citation = Citation(len(self._citations), reference, reference_url)
+        self._citations.append(citation)
+        self._citation_keys[key] = citation
+        for string in set(key):
+            if string is not None:
+                self._citation_strings.setdefault(string, []).append(citation)
+        return citation
+
+    def find(self, source: Union[Citation, int, str]) -> List[Citation]:
+        '''
+        Find citations matching a source.  The source may be a `Citation`, a
+        citation ID, or a string that is compared against both references
+        and reference URLs.
+        '''
+        if isinstance(source, Citation):
+            return [source]
+        if isinstance(source, int):
+            try:
+                return [self._citations[source]]
+            except IndexError:
+                raise TheVerseError(f'Citation ID {source} does not exist')
+        if isinstance(source, str):
+            return list(self._citation_strings.get(source, []))
+        raise TypeError
+
+    def values_from(self, source: Union[Citation, int, str]) -> list:
+        '''
+        All linked values sourced from a citation, citation ID, reference, or
+        reference URL.
+        '''
+        values = []
+        for citation in self.find(source):
+            values.extend(citation.values)
+        return values
+
+    def bibliography(self, items: Iterable) -> List[Citation]:
+        '''
+        Unique citations for a collection of values and/or objects, such as
+        all values used in a problem set.  Citations are returned in the
+        order in which they were first interned.  For objects, the citations
+        of all their attributes are included.
+        '''
+        citations = {}
+        for item in items:
+            try:
+                item_citations = item.citations
+            except AttributeError:
+                try:
+                    item_citations = [item.citation]
+                except AttributeError:
+                    raise TypeError(f'{item.__class__} does not provide citations')
+            for citation in item_citations:
+                if citation is not None:
+                    citations[citation.id] = citation
+        return [citations[k] for k in sorted(citations)]
+
+
+citations = CitationRegistry()
+
+
+def _intern_citation(reference: Optional[str], reference_url: Optional[str]) -> Citation:
+    return citations.intern(reference, reference_url)
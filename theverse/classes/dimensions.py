@@ -13,6 +13,7 @@ Units for dimensional analysis checks.
 '''
 
 
+import astropy.units
 import astropy.units.si as si
 
 
@@ -20,3 +21,5 @@ mass = si.kg
 length = si.m
 time = si.s
 speed = length/time
+angle = si.rad
+dimensionless = astropy.units.dimensionless_unscaled
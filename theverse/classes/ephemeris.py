@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Vectorized Keplerian (two-body) ephemerides.
+'''
+
+
+from typing import Tuple, Union
+import numpy
+import astropy.constants
+import astropy.time
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+# Epoch of orbital elements
+J2000 = astropy.time.Time('J2000', scale='tt')
+
+
+class Ephemeris(object):
+    '''
+    Positions and velocities of many bodies at many epochs, computed from
+    Keplerian orbital elements.  Each body orbits the central mass of its
+    `primary`; positions and velocities are relative to the primary, in the
+    reference frame of the orbital elements (for planets in the Solar
+    System, the ecliptic and equinox of J2000).
+
+    Everything that depends only on the orbital elements is computed once
+    when the ephemeris is created, so that evaluation for any number of
+    epochs is a single batch of NumPy operations.  Objects without complete
+    orbital elements or without a primary are not included in `.bodies`.
+    '''
+    def __init__(self, objects, *, max_iterations: int=50, tolerance: float=1e-14):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.bodies = []
+        elements = []
+        for obj in objects:
+            try:
+                body_elements = [obj.semimajor_axis.to_value(astropy.units.m),
+                                 obj.eccentricity.to_value(astropy.units.dimensionless_unscaled),
+                                 obj.inclination.to_value(astropy.units.rad),
+                                 obj.longitude_of_ascending_node.to_value(astropy.units.rad),
+                                 obj.longitude_of_perihelion.to_value(astropy.units.rad),
+                                 obj.mean_longitude.to_value(astropy.units.rad)]
+                central_mass = obj.primary.mass.to_value(astropy.units.kg)
+            except AttributeError:
+                continue
+            try:
+                central_mass += obj.mass.to_value(astropy.units.kg)
+            except AttributeError:
+                pass
+            self.bodies.append(obj)
+            elements.append(body_elements + [central_mass])
+        elements = numpy.array(elements, dtype=float).reshape(-1, 7)
+        a, e, i, node, perihelion, mean_longitude, central_mass = elements.T
+        if numpy.any((e < 0) | (e >= 1)):
+            raise TheVerseError('Ephemerides are only supported for elliptical orbits')
+
+        # Per-body constants, as column vectors for broadcasting over epochs
+        self._a = a[:, numpy.newaxis]
+        self._e = e[:, numpy.newaxis]
+        self._b = (a * numpy.sqrt(1 - e**2))[:, numpy.newaxis]
+        self._mean_motion = numpy.sqrt(astropy.constants.G.si.value * central_mass / a**3)[:, numpy.newaxis]
+        self._mean_anomaly_at_epoch = (mean_longitude - perihelion)[:, numpy.newaxis]
+        argument_of_perihelion = perihelion - node
+        cos_w, sin_w = numpy.cos(argument_of_perihelion), numpy.sin(argument_of_perihelion)
+        cos_node, sin_node = numpy.cos(node), numpy.sin(node)
+        cos_i, sin_i = numpy.cos(i), numpy.sin(i)
+        # Unit vectors toward perihelion (P) and 90 degrees ahead of it in
+        # the orbital plane (Q), with shape (bodies, 1, 3)
+        self._p = numpy.stack([cos_node*cos_w - sin_node*sin_w*cos_i,
+                               sin_node*cos_w + cos_node*sin_w*cos_i,
+                               sin_w*sin_i], axis=-1)[:, numpy.newaxis, :]
+        self._q = numpy.stack([-cos_node*sin_w - sin_node*cos_w*cos_i,
+                               -sin_node*sin_w + cos_node*cos_w*cos_i,
+                               cos_w*sin_i], axis=-1)[:, numpy.newaxis, :]
+
+    def __len__(self):
+        return len(self.bodies)
+
+    @staticmethod
+    def _epochs_to_seconds(epochs: Union[astropy.time.Time, astropy.units.Quantity]) -> numpy.ndarray:
+        if isinstance(epochs, astropy.time.Time):
+            seconds = (epochs - J2000).to_value(astropy.units.s)
+        elif isinstance(epochs, astropy.units.Quantity):
+            seconds = epochs.to_value(astropy.units.s)
+        else:
+            raise TypeError('Epochs must be an Astropy Time, or a time Quantity measured from J2000')
+        return numpy.atleast_1d(numpy.asarray(seconds, dtype=float))
+
+    def eccentric_anomaly(self, epochs: Union[astropy.time.Time, astropy.units.Quantity]) -> numpy.ndarray:
+        '''
+        Solve Kepler's equation for all bodies and epochs at once with
+        Newton's method.  Returns eccentric anomalies in radians, with shape
+        `(bodies, epochs)`.
+        '''
+        seconds = self._epochs_to_seconds(epochs)
+        mean_anomaly = self._mean_anomaly_at_epoch + self._mean_motion * seconds
+        mean_anomaly = numpy.remainder(mean_anomaly + numpy.pi, 2*numpy.pi) - numpy.pi
+        e = self._e
+        eccentric_anomaly = mean_anomaly + e * numpy.sin(mean_anomaly)
+        for _ in range(self.max_iterations):
+            delta = ((eccentric_anomaly - e * numpy.sin(eccentric_anomaly) - mean_anomaly) /
+                     (1 - e * numpy.cos(eccentric_anomaly)))
+            eccentric_anomaly -= delta
+            if not delta.size or numpy.max(numpy.abs(delta)) < self.tolerance:
+                break
+        else:
+            raise TheVerseError("Kepler's equation failed to converge")
+        return eccentric_anomaly
+
+    def positions(self, epochs: Union[astropy.time.Time, astropy.units.Quantity]) -> astropy.units.Quantity:
+        '''
+        Positions relative to each body's primary, with shape
+        `(bodies, epochs, 3)`.
+        '''
+        return self.state(epochs)[0]
+
+    def velocities(self, epochs: Union[astropy.time.Time, astropy.units.Quantity]) -> astropy.units.Quantity:
+        '''
+        Velocities relative to each body's primary, with shape
+        `(bodies, epochs, 3)`.
+        '''
+        return self.state(epochs)[1]
+
+    def state(self, epochs: Union[astropy.time.Time, astropy.units.Quantity]) -> Tuple[astropy.units.Quantity, astropy.units.Quantity]:
+        '''
+        Positions and velocities relative to each body's primary, each with
+        shape `(bodies, epochs, 3)`.
+        '''
+        eccentric_anomaly = self.eccentric_anomaly(epochs)
+        cos_E = numpy.cos(eccentric_anomaly)
+        sin_E = numpy.sin(eccentric_anomaly)
+        x = self._a * (cos_E - self._e)
+        y = self._b * sin_E
+        eccentric_anomaly_rate = self._mean_motion / (1 - self._e * cos_E)
+        vx = -self._a * sin_E * eccentric_anomaly_rate
+        vy = self._b * cos_E * eccentric_anomaly_rate
+        positions = x[..., numpy.newaxis] * self._p + y[..., numpy.newaxis] * self._q
+        velocities = vx[..., numpy.newaxis] * self._p + vy[..., numpy.newaxis] * self._q
+        return (astropy.units.Quantity(positions, astropy.units.m, copy=False),
+                astropy.units.Quantity(velocities, astropy.units.m/astropy.units.s, copy=False))
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Batch formatting of quantities with significant figures, for problem text.
+'''
+
+
+import functools
+import re
+from typing import Iterable, List, Optional, Union
+import numpy
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+STYLES = ('text', 'unicode', 'latex')
+NOTATIONS = ('auto', 'scientific', 'fixed')
+
+_superscripts = str.maketrans('0123456789-', '⁰¹²³⁴⁵⁶⁷⁸⁹⁻')
+_division_re = re.compile(r'\s*/\s*')
+
+
+@functools.lru_cache(maxsize=None)
+def unit_string(unit: astropy.units.UnitBase, style: str) -> str:
+    '''
+    String for a unit in a given style, cached for each unit and style.
+    '''
+    if unit == astropy.units.dimensionless_unscaled:
+        return ''
+    if style == 'text':
+        # Spaces separate factors (`m2 kg`), so only those around division
+        # are removed (`m3/(kg s2)`)
+        return _division_re.sub('/', unit.to_string())
+    if style == 'unicode':
+        return unit.to_string('unicode')
+    if style == 'latex':
+        return unit.to_string('latex_inline').strip('$')
+    raise ValueError(f'Unknown style "{style}"; expected one of {", ".join(STYLES)}')
+
+
+def format_values(values: Union[numpy.ndarray, Iterable[float]],
+                  unit: Optional[Union[str, astropy.units.UnitBase]]=None,
+                  *,
+                  sig_figs: int=4,
+                  style: str='text',
+                  notation: str='auto',
+                  name: Optional[str]=None) -> List[Optional[str]]:
+    '''
+    Format an array of values in a unit, all in one pass.  Mantissas and
+    exponents are computed with NumPy for the whole array.  NaN values give
+    `None`.
+
+    Styles:
+      * `text`:  `5.972e24 kg`, `6.674e-11 m3/(kg s2)`
+      * `unicode`:  `5.972 × 10²⁴ kg`
+      * `latex`:  `5.972 \\times 10^{24}\\,\\mathrm{kg}`
+
+    Notation `auto` uses fixed-point notation for values from 0.001 up to
+    (but not including) 10000, and scientific notation otherwise.  If `name`
+    is given, each string is prefixed with `"<name> = "`.
+    '''
+    if not isinstance(sig_figs, int):
+        raise TypeError
+    if sig_figs < 1:
+        raise ValueError('There must be at least one significant figure')
+    if style not in STYLES:
+        raise ValueError(f'Unknown style "{style}"; expected one of {", ".join(STYLES)}')
+    if notation not in NOTATIONS:
+        raise ValueError(f'Unknown notation "{notation}"; expected one of {", ".join(NOTATIONS)}')
+    values = numpy.asarray(values, dtype=float).ravel()
+    missing = ~numpy.isfinite(values)
+    abs_values = numpy.where(missing | (values == 0), 1.0, numpy.abs(values))
+    exponents = numpy.floor(numpy.log10(abs_values)).astype(int)
+    mantissas = numpy.round(values / 10.0**exponents, sig_figs - 1)
+    # Rounding may carry into another digit (9.9996 -> 10.000)
+    carry = numpy.abs(mantissas) >= 10
+    exponents[carry] += 1
+    mantissas[carry] /= 10
+    if notation == 'auto':
+        fixed = (exponents >= -3) & (exponents < 4)
+    else:
+        fixed = numpy.full(len(values), notation == 'fixed')
+    decimals = numpy.maximum(sig_figs - 1 - exponents, 0)
+
+    unit_str = '' if unit is None else unit_string(astropy.units.Unit(unit), style)
+    if unit_str:
+        if style == 'latex':
+            unit_str = '\\,' + unit_str
+        else:
+            unit_str = ' ' + unit_str
+    prefix = '' if name is None else f'{name} = '
+
+    strings: List[Optional[str]] = []
+    for mantissa, exponent, is_fixed, n_decimals, is_missing in zip(
+            mantissas.tolist(), exponents.tolist(), fixed.tolist(), decimals.tolist(), missing.tolist()):
+        if is_missing:
+            strings.append(None)
+            continue
+        if is_fixed:
+            number = f'{mantissa * 10.0**exponent:.{n_decimals}f}'
+        else:
+            number = f'{mantissa:.{sig_figs - 1}f}'
+            if style == 'text':
+                number += f'e{exponent}'
+            elif style == 'unicode':
+                number += ' × 10' + str(exponent).translate(_superscripts)
+            else:
+                number += f' \\times 10^{{{exponent}}}'
+        strings.append(f'{prefix}{number}{unit_str}')
+    return strings
+
+
+def format_quantities(quantities: Union[astropy.units.Quantity, Iterable[astropy.units.Quantity]],
+                      *,
+                      sig_figs: int=4,
+                      style: str='text',
+                      notation: str='auto',
+                      names: bool=False) -> List[Optional[str]]:
+    '''
+    Format quantities in one pass.  `quantities` may be a `Quantity` array
+    or an iterable of scalar quantities, which are converted to the unit of
+    the first quantity.  With `names=True`, each string is prefixed with the
+    quantity's name (for example, `"equatorial radius = 6.378e6 m"`), as set
+    via `_attr_quant_names` for attributes of objects.
+
+    See `format_values()` for styles and notations.
+    '''
+    kwargs = {'sig_figs': sig_figs, 'style': style, 'notation': notation}
+    if isinstance(quantities, astropy.units.Quantity) and not quantities.isscalar:
+        name = getattr(quantities, 'name', None) if names else None
+        return format_values(quantities.value, quantities.unit, name=name, **kwargs)
+    quantities = list(quantities)
+    if not quantities:
+        return []
+    unit = quantities[0].unit
+    try:
+        values = numpy.array([q.to_value(unit) for q in quantities], dtype=float)
+    except astropy.units.UnitsError:
+        raise TheVerseError('Quantities formatted together must have compatible units')
+    if not names:
+        return format_values(values, unit, **kwargs)
+    quant_names = [getattr(q, 'name', None) for q in quantities]
+    if all(x == quant_names[0] for x in quant_names):
+        return format_values(values, unit, name=quant_names[0], **kwargs)
+    strings = format_values(values, unit, **kwargs)
+    return [s if n is None else f'{n} = {s}' for s, n in zip(strings, quant_names)]
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Unit-checked formulas that are compiled to NumPy expressions over columns.
+
+A formula such as `G * mass / radius**2` is parsed once for a class of
+objects.  Names are attributes with units (`_attr_units`), dotted paths
+through links (`primary.mass`), Astropy constants (`G`, `c`, `R_earth`,
+...), or `pi`.  Units are checked with the same rules as Astropy unit
+arithmetic, but only when the formula is compiled.  The compiled form is a
+plain function of float arrays in SI units, so evaluating it over a
+collection is a few NumPy operations.
+'''
+
+
+import ast
+import functools
+import numbers
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+import numpy
+import astropy.constants
+import astropy.units
+from . import dimensions as dim
+from ..err import TheVerseError
+
+
+
+
+# Functions that may be called in formulas.  Values are the kinds of
+# arguments they take and the kinds of results they give.
+_functions = {
+    'sqrt': 'root',
+    'cbrt': 'root',
+    'abs': 'same',
+    'exp': 'dimensionless',
+    'log': 'dimensionless',
+    'log2': 'dimensionless',
+    'log10': 'dimensionless',
+    'sin': 'trig',
+    'cos': 'trig',
+    'tan': 'trig',
+    'arcsin': 'inverse_trig',
+    'arccos': 'inverse_trig',
+    'arctan': 'inverse_trig',
+}
+
+_binary_operators = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.Pow: '**',
+}
+
+
+
+
+class CompiledFormula(object):
+    '''
+    Formula compiled for a class of objects.  `.columns` are the attribute
+    paths the formula uses, `.column_units` their SI units, and `.unit` the
+    unit of the result.
+    '''
+    def __init__(self, formula: str, columns: Tuple[str, ...], column_units: Tuple[astropy.units.UnitBase, ...],
+                 unit: astropy.units.UnitBase, function: Callable[..., numpy.ndarray]):
+        self.formula = formula
+        self.columns = columns
+        self.column_units = column_units
+        self.unit = unit
+        self._function = function
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {repr(self.formula)} unit={repr(self.unit)}>'
+
+    def evaluate(self, columns: Sequence[Union[astropy.units.Quantity, numpy.ndarray]], size: int,
+                 unit: Optional[astropy.units.UnitBase]=None) -> astropy.units.Quantity:
+        '''
+        Evaluate the formula for `size` objects, given column arrays in the
+        order of `.columns`, with a result in `unit` (by default, `.unit`).
+        Columns are `Quantity` arrays or float arrays in `.column_units`.
+        Columns with no values (object arrays of `None`) are treated as all
+        NaN.
+        '''
+        values = []
+        for column, column_unit in zip(columns, self.column_units):
+            if isinstance(column, astropy.units.Quantity):
+                values.append(column.to_value(column_unit))
+            elif column.dtype == object:
+                values.append(numpy.full(len(column), numpy.nan))
+            else:
+                values.append(column)
+        if unit is None:
+            unit = self.unit
+            scale = 1.0
+        else:
+            try:
+                scale = self.unit.to(unit)
+            except astropy.units.UnitsError:
+                raise TheVerseError(f'Formula "{self.formula}" gives "{self.unit}", which cannot be converted '
+                                    f'to "{unit}"')
+        with numpy.errstate(all='ignore'):
+            result = self._function(*values)
+        result = numpy.array(numpy.broadcast_to(result, (size,)), dtype=float)
+        if scale != 1.0:
+            result *= scale
+        result.flags.writeable = False
+        return astropy.units.Quantity(result, unit, copy=False)
+
+
+
+
+class _Compiler(object):
+    '''
+    Translate a parsed formula into Python source for a function of column
+    arrays, while computing the unit of each subexpression.
+    '''
+    def __init__(self, cls, formula: str):
+        self.cls = cls
+        self.formula = formula
+        self.columns: List[str] = []
+        self.column_units: List[astropy.units.UnitBase] = []
+
+    def error(self, message: str) -> TheVerseError:
+        return TheVerseError(f'Invalid formula "{self.formula}": {message}')
+
+    def compile(self, node: ast.AST) -> Tuple[str, astropy.units.UnitBase]:
+        method = getattr(self, f'compile_{node.__class__.__name__}', None)
+        if method is None:
+            raise self.error(f'unsupported syntax "{ast.get_source_segment(self.formula, node) or node.__class__.__name__}"')
+        return method(node)
+
+    def convert(self, source: str, unit: astropy.units.UnitBase, target: astropy.units.UnitBase,
+                description: str) -> str:
+        try:
+            scale = unit.to(target)
+        except astropy.units.UnitsError:
+            raise self.error(f'{description}; "{unit.to_string() or "dimensionless"}" is not compatible with '
+                             f'"{target.to_string() or "dimensionless"}"')
+        if scale == 1.0:
+            return source
+        return f'({repr(scale)} * {source})'
+
+    def compile_Expression(self, node: ast.Expression):
+        return self.compile(node.body)
+
+    def compile_Constant(self, node: ast.Constant):
+        if not isinstance(node.value, numbers.Real) or isinstance(node.value, bool):
+            raise self.error(f'unsupported constant {repr(node.value)}')
+        return (repr(float(node.value)), dim.dimensionless)
+
+    def compile_Name(self, node: ast.Name):
+        return self.compile_path(node.id)
+
+    def compile_Attribute(self, node: ast.Attribute):
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            raise self.error('attribute paths must consist of names')
+        parts.append(node.id)
+        return self.compile_path('.'.join(reversed(parts)))
+
+    def compile_path(self, path: str):
+        unit = _attr_path_unit(self.cls, path)
+        if unit is not None:
+            try:
+                index = self.columns.index(path)
+            except ValueError:
+                index = len(self.columns)
+                self.columns.append(path)
+                self.column_units.append(unit)
+            return (f'c{index}', unit)
+        if '.' not in path:
+            if path == 'pi':
+                return (repr(numpy.pi), dim.dimensionless)
+            constant = getattr(astropy.constants, path, None)
+            if isinstance(constant, astropy.constants.Constant):
+                constant = constant.si
+                return (repr(float(constant.value)), constant.unit)
+        raise self.error(f'"{path}" is not a quantity attribute of {self.cls.__name__} or a constant')
+
+    def compile_UnaryOp(self, node: ast.UnaryOp):
+        source, unit = self.compile(node.operand)
+        if isinstance(node.op, ast.USub):
+            return (f'(-{source})', unit)
+        if isinstance(node.op, ast.UAdd):
+            return (source, unit)
+        raise self.error('unsupported unary operator')
+
+    def compile_BinOp(self, node: ast.BinOp):
+        try:
+            operator = _binary_operators[type(node.op)]
+        except KeyError:
+            raise self.error('unsupported operator')
+        left, left_unit = self.compile(node.left)
+        if operator == '**':
+            exponent = _constant_value(node.right)
+            if exponent is None:
+                right, right_unit = self.compile(node.right)
+                right = self.convert(right, right_unit, dim.dimensionless, 'exponents must be dimensionless')
+                left = self.convert(left, left_unit, dim.dimensionless,
+                                    'only dimensionless values can be raised to variable powers')
+                return (f'({left} ** {right})', dim.dimensionless)
+            return (f'({left} ** {repr(exponent)})', left_unit**exponent)
+        right, right_unit = self.compile(node.right)
+        if operator in ('+', '-'):
+            right = self.convert(right, right_unit, left_unit, f'cannot apply "{operator}" to "{left_unit}" and "{right_unit}"')
+            return (f'({left} {operator} {right})', left_unit)
+        if operator == '*':
+            return (f'({left} * {right})', left_unit * right_unit)
+        return (f'({left} / {right})', left_unit / right_unit)
+
+    def compile_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _functions:
+            raise self.error(f'unsupported function; expected one of {", ".join(_functions)}')
+        if node.keywords or len(node.args) != 1:
+            raise self.error(f'"{node.func.id}()" takes exactly one argument')
+        name = node.func.id
+        kind = _functions[name]
+        source, unit = self.compile(node.args[0])
+        if kind == 'root':
+            return (f'numpy.{name}({source})', unit**(0.5 if name == 'sqrt' else 1/3))
+        if kind == 'same':
+            return (f'numpy.{name}({source})', unit)
+        if kind == 'trig':
+            target = dim.angle if unit.is_equivalent(dim.angle) else dim.dimensionless
+            source = self.convert(source, unit, target, f'"{name}()" takes an angle')
+            return (f'numpy.{name}({source})', dim.dimensionless)
+        source = self.convert(source, unit, dim.dimensionless, f'"{name}()" takes a dimensionless value')
+        if kind == 'inverse_trig':
+            return (f'numpy.{name}({source})', dim.angle)
+        return (f'numpy.{name}({source})', dim.dimensionless)
+
+
+def _constant_value(node: ast.AST) -> Optional[float]:
+    '''
+    Value of a numeric constant expression such as `2`, `-1`, or `1/3`, or
+    `None` if the expression is not constant.
+    '''
+    if isinstance(node, ast.Constant) and isinstance(node.value, numbers.Real) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _constant_value(node.operand)
+        if value is None:
+            return None
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+        left = _constant_value(node.left)
+        right = _constant_value(node.right)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, ast.Add):
+            return left + right
+        if isinstance(node.op, ast.Sub):
+            return left - right
+        if isinstance(node.op, ast.Mult):
+            return left * right
+        if right == 0:
+            return None
+        return left / right
+    return None
+
+
+def _attr_path_unit(cls, path: str) -> Optional[astropy.units.UnitBase]:
+    '''
+    Unit of the quantity attribute at a dotted path through links, based on
+    class schemas (`_attr_units`, `_attr_links`, and `_attr_fallbacks`), or
+    `None` if there is no such attribute.
+    '''
+    return _resolve_attr_path(cls, path, '_attr_units')
+
+
+def attr_path_link(cls, path: str):
+    '''
+    Class of the link at a dotted path through links, or `None` if there is
+    no such link.
+    '''
+    return _resolve_attr_path(cls, path, '_attr_links')
+
+
+def attr_path_kind(cls, path: str) -> Optional[str]:
+    '''
+    Kind of value at a dotted path through links (`"quantity"`, `"link"`, or
+    `"string"`), or `None` if there is no such attribute.  Collections of
+    links are not values, so they give `None`.
+    '''
+    if _resolve_attr_path(cls, path, '_attr_links') is not None:
+        return 'link'
+    if _resolve_attr_path(cls, path, '_attr_strings') is not None:
+        return 'string'
+    if _resolve_attr_path(cls, path, '_attr_units') is not None:
+        return 'quantity'
+    return None
+
+
+def _resolve_attr_path(cls, path: str, last_schema: str):
+    parts = path.split('.')
+    for n, part in enumerate(parts):
+        last = n == len(parts) - 1
+        schema = getattr(cls, last_schema) if last else cls._attr_links
+        if part not in schema:
+            aliases = cls._attr_fallbacks.get(part, ())
+            if isinstance(aliases, str):
+                aliases = [aliases]
+            part = next((alias for alias in aliases if alias in schema), None)
+            if part is None:
+                return None
+        if last:
+            # Strings are listed rather than mapped
+            return schema[part] if isinstance(schema, dict) else part
+        cls = schema[part]
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def compile_formula(cls, formula: str) -> CompiledFormula:
+    '''
+    Parse, unit-check, and compile a formula for objects of class `cls`.
+    Compiled formulas are cached for each class and formula.
+    '''
+    if not isinstance(formula, str):
+        raise TypeError
+    try:
+        tree = ast.parse(formula.strip(), mode='eval')
+    except SyntaxError:
+        raise TheVerseError(f'Invalid formula "{formula}": syntax error')
+    compiler = _Compiler(cls, formula)
+    source, unit = compiler.compile(tree)
+    args = ', '.join(f'c{n}' for n in range(len(compiler.columns)))
+    function = eval(compile(f'lambda {args}: {source}', f'<formula {formula}>', 'eval'), {'numpy': numpy})
+    return CompiledFormula(formula, tuple(compiler.columns), tuple(compiler.column_units), unit, function)
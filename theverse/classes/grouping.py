@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Group-by aggregation over the columns of collections of objects.
+'''
+
+
+from typing import Dict, Tuple, Union
+import numpy
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+AGGREGATIONS = ('count', 'sum', 'mean', 'std', 'min', 'max', 'median')
+
+
+def _readonly(array: numpy.ndarray) -> numpy.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def aggregate(values: numpy.ndarray, inverse: numpy.ndarray, n_groups: int, how: str) -> numpy.ndarray:
+    '''
+    Aggregate float `values` into `n_groups` groups, where `inverse` gives
+    the group index of each value.  NaN values are ignored, and groups with
+    no values give NaN (or a count of zero).  `std` is the population
+    standard deviation.
+    '''
+    present = ~numpy.isnan(values)
+    counts = numpy.bincount(inverse[present], minlength=n_groups)
+    if how == 'count':
+        return counts
+    empty = counts == 0
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        if how == 'sum':
+            result = numpy.bincount(inverse[present], weights=values[present], minlength=n_groups)
+            result[empty] = numpy.nan
+        elif how in ('mean', 'std'):
+            sums = numpy.bincount(inverse[present], weights=values[present], minlength=n_groups)
+            result = sums / counts
+            if how == 'std':
+                deviations = values[present] - result[inverse[present]]
+                result = numpy.sqrt(numpy.bincount(inverse[present], weights=deviations**2, minlength=n_groups) / counts)
+        elif how in ('min', 'max'):
+            if how == 'min':
+                result = numpy.full(n_groups, numpy.inf)
+                numpy.minimum.at(result, inverse[present], values[present])
+            else:
+                result = numpy.full(n_groups, -numpy.inf)
+                numpy.maximum.at(result, inverse[present], values[present])
+            result[empty] = numpy.nan
+        elif how == 'median':
+            # Sort by group and then by value, so that each group's values
+            # are contiguous and sorted
+            order = numpy.lexsort((values[present], inverse[present]))
+            sorted_values = values[present][order]
+            starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+            lower = starts + (counts - 1) // 2
+            upper = starts + counts // 2
+            result = numpy.full(n_groups, numpy.nan)
+            result[~empty] = (sorted_values[lower[~empty]] + sorted_values[upper[~empty]]) / 2
+        else:
+            raise ValueError(f'Unknown aggregation "{how}"; expected one of {", ".join(AGGREGATIONS)}')
+    return result
+
+
+
+
+class GroupBy(object):
+    '''
+    Objects in a collection grouped by the values of an attribute, for
+    computing aggregates of other attributes with NumPy.  Created with
+    `LinkDict.group_by()`.
+
+    Groups are sorted by key.  Objects with a missing key are not in any
+    group.
+    '''
+    def __init__(self, linkdict, attr: str):
+        self._linkdict = linkdict
+        self._attr = attr
+        self._keys, self._inverse, self._members = linkdict.cached(('group_by', attr), self._compute_groups)
+
+    def _compute_groups(self) -> Tuple[Union[numpy.ndarray, astropy.units.Quantity], numpy.ndarray, numpy.ndarray]:
+        column = self._linkdict.column(self._attr)
+        if isinstance(column, astropy.units.Quantity):
+            members = numpy.flatnonzero(~numpy.isnan(column.value))
+            unique, inverse = numpy.unique(column.value[members], return_inverse=True)
+            keys = astropy.units.Quantity(_readonly(unique), column.unit, copy=False)
+        else:
+            members = numpy.flatnonzero(column != None)
+            unique, inverse = numpy.unique(column[members], return_inverse=True)
+            keys = _readonly(unique)
+        return (keys, _readonly(inverse.ravel()), _readonly(members))
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def attr(self) -> str:
+        return self._attr
+
+    @property
+    def keys(self) -> Union[numpy.ndarray, astropy.units.Quantity]:
+        '''
+        Group keys, in order.  Links give the names of linked objects.
+        '''
+        return self._keys
+
+    def agg(self, **aggregations: Union[str, Tuple[str, str]]) -> Dict[str, Union[numpy.ndarray, astropy.units.Quantity]]:
+        '''
+        Aggregate attributes over each group.  Each keyword argument is
+        either `attr=how` or `result_name=(attr, how)`, where `how` is one of
+        `count`, `sum`, `mean`, `std`, `min`, `max`, and `median`.  `attr`
+        may be a dotted path through links.
+
+        Returns a dict that maps the grouping attribute to the group keys,
+        and each keyword to an array of results in the same order.  Results
+        are `Quantity` arrays in SI units, except for counts.  Missing values
+        are ignored.  Results are cached.
+        '''
+        specs = []
+        for name, spec in aggregations.items():
+            if isinstance(spec, str):
+                attr, how = name, spec
+            elif isinstance(spec, tuple) and len(spec) == 2 and all(isinstance(x, str) for x in spec):
+                attr, how = spec
+            else:
+                raise TypeError(f'Invalid aggregation for "{name}"; expected "how" or ("attr", "how")')
+            if how not in AGGREGATIONS:
+                raise ValueError(f'Unknown aggregation "{how}"; expected one of {", ".join(AGGREGATIONS)}')
+            specs.append((name, attr, how))
+        specs_key = tuple(specs)
+
+        def compute():
+            results = {self._attr: self._keys}
+            for name, attr, how in specs_key:
+                column = self._linkdict.column(attr)
+                if isinstance(column, astropy.units.Quantity):
+                    values = column.value[self._members]
+                elif how == 'count':
+                    values = numpy.where(column[self._members] == None, numpy.nan, 0.0)
+                else:
+                    raise TheVerseError(f'Cannot compute "{how}" of attribute "{attr}", which is not a quantity')
+                result = _readonly(aggregate(values, self._inverse, len(self._keys), how))
+                if how != 'count':
+                    result = astropy.units.Quantity(result, column.unit, copy=False)
+                results[name] = result
+            return results
+        return dict(self._linkdict.cached(('agg', self._attr, specs_key), compute))
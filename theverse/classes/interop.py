@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Conversion of collections of objects to and from pandas dataframes and Arrow
+tables.  pandas and pyarrow are optional; they are only imported when used.
+
+Exported columns are built from the cached, read-only columns of a
+collection.  Quantities are float columns in SI units that share the column
+buffers where the library allows it (always for Arrow; for pandas, depending
+on the version and its copy-on-write settings), with units in metadata.
+Links, references, and reference URLs are categorical (dictionary-encoded)
+columns of names, and other strings are string columns.  Missing quantities
+are NaN, and missing links and strings are null.
+
+Units are stored in `DataFrame.attrs['units']` for pandas, and as `unit`
+field metadata for Arrow.
+'''
+
+
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+# Exported column:  (name, kind, values, unit), where kind is one of
+# "quantity", "link", "string", and "category"
+Column = Tuple[str, str, Any, Optional[astropy.units.UnitBase]]
+
+
+def _import_pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise TheVerseError('pandas is required for dataframe conversion; install it with "pip install pandas"')
+    return pandas
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise TheVerseError('pyarrow is required for Arrow conversion; install it with "pip install pyarrow"')
+    return pyarrow
+
+
+
+
+def to_pandas(names: numpy.ndarray, columns: Sequence[Column]):
+    pandas = _import_pandas()
+    data = {}
+    units = {}
+    for name, kind, values, unit in columns:
+        if kind == 'quantity':
+            data[name] = values
+            units[name] = unit.to_string()
+        elif kind in ('link', 'category'):
+            data[name] = pandas.Categorical(values)
+        else:
+            data[name] = values
+    dataframe = pandas.DataFrame(data, index=pandas.Index(names, name='name'), copy=False)
+    dataframe.attrs['units'] = units
+    return dataframe
+
+
+def to_arrow(names: numpy.ndarray, columns: Sequence[Column]):
+    pyarrow = _import_pyarrow()
+    arrays = [pyarrow.array(names, type=pyarrow.string())]
+    fields = [pyarrow.field('name', pyarrow.string())]
+    for name, kind, values, unit in columns:
+        if kind == 'quantity':
+            # Float arrays without a mask are wrapped, not copied
+            array = pyarrow.array(values, type=pyarrow.float64())
+            fields.append(pyarrow.field(name, array.type, metadata={'unit': unit.to_string()}))
+        else:
+            array = pyarrow.array(values, type=pyarrow.string(), from_pandas=True)
+            if kind in ('link', 'category'):
+                array = array.dictionary_encode()
+            fields.append(pyarrow.field(name, array.type))
+        arrays.append(array)
+    return pyarrow.Table.from_arrays(arrays, schema=pyarrow.schema(fields))
+
+
+
+
+# Imported column:  (name, values, unit), where values are a float array for
+# columns with units and a list otherwise
+ImportedColumn = Tuple[str, Any, Optional[astropy.units.UnitBase]]
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def from_pandas(dataframe) -> Tuple[List[str], List[ImportedColumn]]:
+    '''
+    Names and columns of a dataframe.  Names are taken from a `name` column
+    if there is one, and otherwise from the index.
+    '''
+    pandas = _import_pandas()
+    if not isinstance(dataframe, pandas.DataFrame):
+        raise TypeError
+    units = dataframe.attrs.get('units', {})
+    if 'name' in dataframe.columns:
+        names = dataframe['name'].tolist()
+    else:
+        names = dataframe.index.tolist()
+    columns = []
+    for name in dataframe.columns:
+        if name == 'name':
+            continue
+        series = dataframe[name]
+        if pandas.api.types.is_numeric_dtype(series.dtype) and not pandas.api.types.is_bool_dtype(series.dtype):
+            unit = units.get(name)
+            columns.append((name, series.to_numpy(dtype=float), None if unit is None else astropy.units.Unit(unit)))
+        else:
+            columns.append((name, [None if _is_missing(x) else x for x in series.tolist()], None))
+    return (names, columns)
+
+
+def from_arrow(table) -> Tuple[List[str], List[ImportedColumn]]:
+    '''
+    Names and columns of an Arrow table, which must have a `name` column.
+    '''
+    pyarrow = _import_pyarrow()
+    if not isinstance(table, pyarrow.Table):
+        raise TypeError
+    if 'name' not in table.column_names:
+        raise TheVerseError('Arrow tables must have a "name" column')
+    names = table.column('name').to_pylist()
+    columns = []
+    for field in table.schema:
+        if field.name == 'name':
+            continue
+        column = table.column(field.name)
+        if pyarrow.types.is_floating(field.type) or pyarrow.types.is_integer(field.type):
+            unit = (field.metadata or {}).get(b'unit')
+            values = column.to_numpy().astype(float, copy=False)
+            columns.append((field.name, values, None if unit is None else astropy.units.Unit(unit.decode('utf8'))))
+        else:
+            columns.append((field.name, column.to_pylist(), None))
+    return (names, columns)
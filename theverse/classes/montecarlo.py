@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Batched Monte Carlo sampling and propagation of uncertainties.
+'''
+
+
+from typing import Callable, Dict, Iterable, Optional, Union
+import numpy
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+class MonteCarlo(object):
+    '''
+    Draw `n` samples per quantity as NumPy arrays, using each quantity's
+    standard uncertainty (normal distribution).  Quantities without an
+    uncertainty are treated as exact, so their samples are constant.
+
+    Samples for many objects are drawn in a single call, with shape
+    `(len(objects), n)`, so that derived formulas can then be evaluated for
+    all objects and all samples in one vectorized pass with `.propagate()`.
+    '''
+    def __init__(self, n: int=10_000, *, seed: Optional[Union[int, numpy.random.Generator]]=None):
+        if not isinstance(n, int):
+            raise TypeError
+        if n < 1:
+            raise ValueError('Number of samples must be positive')
+        self.n = n
+        if isinstance(seed, numpy.random.Generator):
+            self.rng = seed
+        else:
+            self.rng = numpy.random.default_rng(seed)
+
+    def _draw(self, values: numpy.ndarray, uncertainties: numpy.ndarray) -> numpy.ndarray:
+        samples = self.rng.standard_normal((len(values), self.n))
+        samples *= uncertainties[:, numpy.newaxis]
+        samples += values[:, numpy.newaxis]
+        return samples
+
+    def sample(self, quantity: astropy.units.Quantity) -> astropy.units.Quantity:
+        '''
+        Samples for a single scalar quantity, with shape `(n,)`.
+        '''
+        if not isinstance(quantity, astropy.units.Quantity):
+            raise TypeError
+        uncertainty = getattr(quantity, '_uncertainty', None)
+        if uncertainty is None:
+            uncertainty = 0.0
+        samples = self._draw(numpy.array([quantity.value], dtype=float),
+                             numpy.array([uncertainty], dtype=float))
+        return astropy.units.Quantity(samples[0], quantity.unit, copy=False)
+
+    def sample_attr(self, objects: Iterable, attr: str) -> astropy.units.Quantity:
+        '''
+        Samples for an attribute of each object, with shape
+        `(len(objects), n)`.  Attribute fallbacks are respected.  Objects
+        that lack the attribute produce rows of NaN.
+        '''
+        objects = list(objects)
+        values = numpy.full(len(objects), numpy.nan)
+        uncertainties = numpy.zeros(len(objects))
+        unit = None
+        for index, obj in enumerate(objects):
+            try:
+                quantity = getattr(obj, attr)
+            except AttributeError:
+                continue
+            if not isinstance(quantity, astropy.units.Quantity):
+                raise TheVerseError(f'"{obj.name}" attribute "{attr}" is not a quantity')
+            if unit is None:
+                unit = quantity.unit
+            if quantity.unit == unit:
+                scale = 1.0
+            else:
+                scale = quantity.unit.to(unit)
+            values[index] = quantity.value * scale
+            uncertainty = getattr(quantity, '_uncertainty', None)
+            if uncertainty is not None:
+                uncertainties[index] = uncertainty * scale
+        if unit is None:
+            raise TheVerseError(f'None of the objects have attribute "{attr}"')
+        return astropy.units.Quantity(self._draw(values, uncertainties), unit, copy=False)
+
+    def sample_attrs(self, objects: Iterable, attrs: Iterable[str]) -> Dict[str, astropy.units.Quantity]:
+        '''
+        Samples for several attributes of each object, as a dict mapping
+        attribute names to arrays with shape `(len(objects), n)`.  These
+        are "realistic perturbed" parameters for the objects.
+        '''
+        objects = list(objects)
+        return {attr: self.sample_attr(objects, attr) for attr in attrs}
+
+    def propagate(self, formula: Callable, *args, **kwargs) -> astropy.units.Quantity:
+        '''
+        Propagate uncertainties through `formula` by calling it once with
+        samples in place of all scalar quantity arguments that have
+        uncertainties.  Array arguments (for example, from
+        `.sample_attrs()`) are passed through unchanged, so they must already
+        contain samples.  Anything else is passed through as an exact value.
+        Astropy constants such as `G` also have uncertainties, so they are
+        sampled as well.
+
+        Returns the array of samples of the result.  Summary statistics can
+        be obtained from it with `.mean()` and `.std()`.
+        '''
+        args = [self._sample_arg(x) for x in args]
+        kwargs = {k: self._sample_arg(v) for k, v in kwargs.items()}
+        return formula(*args, **kwargs)
+
+    def _sample_arg(self, arg):
+        if (isinstance(arg, astropy.units.Quantity) and arg.isscalar and
+                getattr(arg, '_uncertainty', None) is not None):
+            return self.sample(arg)
+        return arg
@@ -9,13 +9,51 @@
 
 
 import re
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
+import numpy
 import astropy.units
+from .citation import Citation, citations
+from .scalar import Scalar, intern_unit
 from ..err import TheVerseError
 
 
 
 
+# Map unit strings to their parsed units, the interned SI units that
+# `.si` converts them to, and the scale factors between the two
+_si_conversions: Dict[str, Tuple[astropy.units.UnitBase, astropy.units.UnitBase, float]] = {}
+
+_number_unit_re = re.compile(r'^\s*(?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?:\s+(?P<unit>\S.*?))?\s*$')
+
+
+def _parse_si(value: str) -> Optional[Tuple[float, astropy.units.UnitBase, astropy.units.UnitBase]]:
+    '''
+    Parse a string of the form `<number> <unit>` into its value in SI units,
+    its SI unit, and its original unit.  This gives the same result as
+    creating an Astropy quantity and converting it with `.si`, while parsing
+    and converting each unit only once.  Return `None` for strings that need
+    Astropy's full parser.
+    '''
+    match = _number_unit_re.match(value)
+    if match is None:
+        return None
+    unit_str = match.group('unit') or ''
+    try:
+        unit, si_unit, scale = _si_conversions[unit_str]
+    except KeyError:
+        try:
+            unit = astropy.units.Unit(unit_str)
+        except ValueError:
+            return None
+        si = unit.si
+        si_unit = intern_unit(si / si.scale)
+        scale = si.scale
+        _si_conversions[unit_str] = (unit, si_unit, scale)
+    return (float(match.group('number')) * scale, si_unit, unit)
+
+
+
+
 class Quantity(astropy.units.Quantity):
     '''
     Version of Astropy's `Quantity` for describing the physical and other
@@ -24,20 +62,29 @@ class Quantity(astropy.units.Quantity):
     represented as a Python object whose attributes are `Quantity` instances.
 
     A quantity may optionally have a name.  It must have a reference or a
-    reference URL for its value.  A quantity will typically be used as an
-    attribute of a Python object that represents a material object.  In this
-    case, `.link_object()` is used to set the quantity's `.object` to the
-    object.
+    reference URL for its value, which is interned as a shared `Citation`.
+    A quantity will typically be used as an attribute of a Python object
+    that represents a material object.  In this case, `.link_object()` is
+    used to set the quantity's `.object` to the object.
 
     `Quantity()` can take a string `value` in which underscores are used as a
     digit separator (for example, `1_234.567_890 kg`).
 
+    A quantity may optionally have a standard uncertainty.  This can be given
+    with the `uncertainty` argument, or as part of a string `value` using
+    `±` or `+/-` (for example, `5.9724e24 ± 0.0003e24 kg`).  Uncertainties
+    are stored in the same SI unit as the value.
+
     `Quantity` units are always SI units.
 
     Astropy references:
       * https://docs.astropy.org/en/stable/api/astropy.units.Quantity.html
       * https://docs.astropy.org/en/stable/api/astropy.constants.Constant.html
     '''
+    # Quantities that Astropy derives from this one (for example, with
+    # `.to()`) are not linked to an object
+    _object = None
+
     def __new__(cls,
                 value: Union[str, astropy.units.Quantity],
                 unit: Optional[Union[str, astropy.units.Unit]]=None,
@@ -45,23 +92,73 @@ class Quantity(astropy.units.Quantity):
                 name=None,
                 reference: Optional[str]=None,
                 reference_url: Optional[str]=None,
+                citation: Optional[Citation]=None,
+                uncertainty: Optional[Union[str, float, astropy.units.Quantity]]=None,
                 **kwargs):
         if isinstance(value, str):
             value = cls._num_underscore_sep_strip(value)
-        inst = super().__new__(cls, value, unit, **kwargs)
-        inst = inst.si
+            match = cls._uncertainty_re.match(value)
+            if match is not None:
+                if uncertainty is not None:
+                    raise TypeError('Uncertainty was given twice')
+                value = f'{match.group("value")} {match.group("unit")}'
+                uncertainty = f'{match.group("uncertainty")} {match.group("unit")}'
+        parsed = None
+        if isinstance(value, str) and unit is None and not kwargs:
+            parsed = _parse_si(value)
+        if parsed is None:
+            inst = super().__new__(cls, value, unit, **kwargs)
+            unit = inst.unit
+            inst = inst.si
+        else:
+            si_value, si_unit, unit = parsed
+            inst = numpy.array(si_value).view(cls)
+            inst._set_unit(si_unit)
+        if uncertainty is not None:
+            if isinstance(uncertainty, str):
+                uncertainty = astropy.units.Quantity(cls._num_underscore_sep_strip(uncertainty))
+            elif not isinstance(uncertainty, astropy.units.Quantity):
+                uncertainty = astropy.units.Quantity(uncertainty, unit)
+            uncertainty = uncertainty.to_value(inst.unit)
+            if numpy.any(uncertainty < 0):
+                raise ValueError('Uncertainty cannot be negative')
+        inst._uncertainty = uncertainty
         if name is not None and not isinstance(name, str):
             raise TypeError
         inst._name = name
         inst._object = None
-        if reference is None and reference_url is None:
-            raise TypeError('At least one of "reference" and "reference_url" must be given')
-        if any(x is not None and not isinstance(x, str) for x in (reference, reference_url)):
+        if citation is None:
+            citation = citations.intern(reference, reference_url)
+        elif not isinstance(citation, Citation):
             raise TypeError
-        inst._reference = reference
-        inst._reference_url = reference_url
+        elif reference is not None or reference_url is not None:
+            raise TypeError('"citation" cannot be combined with "reference" or "reference_url"')
+        inst._citation = citation
+        return inst
+
+    @classmethod
+    def _from_trusted(cls,
+                      value: float,
+                      unit: astropy.units.UnitBase,
+                      name: Optional[str],
+                      citation: Citation,
+                      uncertainty: Optional[float]=None):
+        '''
+        Create a quantity from a value that is already known to be in the SI
+        unit `unit`.  This skips parsing, unit conversion, and argument
+        checking, and is only intended for data that has already been
+        validated.
+        '''
+        inst = numpy.array(value, dtype=float).view(cls)
+        inst._set_unit(unit)
+        inst._name = name
+        inst._object = None
+        inst._citation = citation
+        inst._uncertainty = uncertainty
         return inst
 
+    _uncertainty_re = re.compile(r'^\s*(?P<value>[^\s±]+)\s*(?:±|\+/-)\s*(?P<uncertainty>[^\s]+)\s+(?P<unit>.+)$')
+
     @staticmethod
     def _num_underscore_sep_strip(num_str, _regex=re.compile(r'(?<=[0-9])_(?=[0-9])')):
         return _regex.sub(r'', num_str)
@@ -70,6 +167,7 @@ class Quantity(astropy.units.Quantity):
         return (f'<{self.__class__} '
                 f'name={repr(self.name)} '
                 f'value={self.value} unit={repr(self.unit)} '
+                f'uncertainty={self._uncertainty} '
                 f'reference={repr(self.reference)} '
                 f'reference_url={repr(self.reference_url)} '
                 f'object={repr(self.object)}>')
@@ -78,26 +176,61 @@ class Quantity(astropy.units.Quantity):
     def name(self):
         return self._name
 
+    @property
+    def uncertainty(self) -> Optional[astropy.units.Quantity]:
+        '''
+        Standard uncertainty as an Astropy `Quantity`, or `None` if the value
+        has no known uncertainty.
+        '''
+        if self._uncertainty is None:
+            return None
+        return astropy.units.Quantity(self._uncertainty, self.unit)
+
     @property
     def object(self):
         return self._object
 
+    @property
+    def citation(self):
+        return self._citation
+
     @property
     def reference(self):
-        return self._reference
+        return self._citation.reference
 
     @property
     def reference_url(self):
-        return self._reference_url
+        return self._citation.reference_url
+
+    def to_scalar(self) -> Scalar:
+        '''
+        Compact `Scalar` version of the quantity for fast arithmetic, with the
+        quantity as its metadata.  A new scalar is created for each call
+        rather than stored, so that quantities do not grow.
+        '''
+        return Scalar(self.value, self.unit, self)
+
+    def __reduce__(self):
+        # The linked object is not pickled, so that pickling a quantity does
+        # not pickle the object graph it belongs to
+        reconstruct, args, (nd_state, own_state) = super().__reduce__()
+        own_state = {k: v for k, v in own_state.items() if k != '_object'}
+        return (reconstruct, args, (nd_state, own_state))
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._object = None
 
     def link_object(self, object):
         if self._object is not None:
             raise TheVerseError(f'"{self.name}" ({self.__class__.__name__}) is already linked to '
                                 f'"{self._object.name}" ({self._object.__class__.__name__})')
         self._object = object
+        self._citation.link_value(self)
 
     def unlink_object(self, object):
         if self._object is object:
             if not object.unlinking:
                 raise TheVerseError('Can only unlink an object by calling its ".unlink()" method')
             self._object = None
+            self._citation.unlink_value(self)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Bounded cache for results of queries on collections of objects.
+'''
+
+
+import collections
+import threading
+from typing import Any, Callable, Hashable
+
+
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class QueryCache(object):
+    '''
+    Least-recently-used cache for query, filter, and derived-column results.
+
+    Keys should include the generation of the collection that was queried
+    (`LinkDict.generation`), which changes whenever objects are linked or
+    unlinked.  Results for old generations are never hit again and are
+    eventually evicted.
+
+    The cache is thread-safe.  Results are computed outside the lock, so
+    concurrent misses for the same key may compute a result more than once.
+    '''
+    def __init__(self, maxsize: int=1024):
+        if not isinstance(maxsize, int):
+            raise TypeError
+        if maxsize < 0:
+            raise ValueError
+        self._maxsize = maxsize
+        self._results: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        if not isinstance(value, int):
+            raise TypeError
+        if value < 0:
+            raise ValueError
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def _evict(self):
+        while len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        '''
+        Return the result for `key`, calling `compute()` to create it if it
+        is not cached.
+        '''
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._results.move_to_end(key)
+                self._hits += 1
+                return result
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            self._evict()
+        return result
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._results))
+
+    def cache_clear(self):
+        with self._lock:
+            self._results.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+query_cache = QueryCache()
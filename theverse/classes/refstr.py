@@ -9,6 +9,7 @@
 
 
 from typing import Optional
+from .citation import Citation, citations
 from ..err import TheVerseError
 
 
@@ -16,47 +17,68 @@ from ..err import TheVerseError
 
 class RefStr(str):
     '''
-    String that also provides reference information.
+    String that also provides reference information, which is interned as a
+    shared `Citation`.
     '''
     def __new__(cls,
                 string: str,
                 *,
                 name=None,
                 reference: Optional[str]=None,
-                reference_url: Optional[str]=None):
+                reference_url: Optional[str]=None,
+                citation: Optional[Citation]=None):
         inst = super().__new__(cls, string)
         if name is not None and not isinstance(name, str):
             raise TypeError
         inst._name = name
         inst._object = None
-        if reference is None and reference_url is None:
-            raise TypeError('At least one of "reference" and "reference_url" must be given')
-        if any(x is not None and not isinstance(x, str) for x in (reference, reference_url)):
+        if citation is None:
+            citation = citations.intern(reference, reference_url)
+        elif not isinstance(citation, Citation):
             raise TypeError
-        inst._reference = reference
-        inst._reference_url = reference_url
+        elif reference is not None or reference_url is not None:
+            raise TypeError('"citation" cannot be combined with "reference" or "reference_url"')
+        inst._citation = citation
         return inst
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def object(self):
+        return self._object
+
+    @property
+    def citation(self):
+        return self._citation
+
     @property
     def reference(self):
-        return self._reference
+        return self._citation.reference
 
     @property
     def reference_url(self):
-        return self._reference_url
+        return self._citation.reference_url
+
+    def __reduce__(self):
+        # The linked object is not pickled
+        return (_unpickle_refstr, (str(self), self._name, self._citation))
 
     def link_object(self, object):
         if self._object is not None:
             raise TheVerseError(f'"{self.name}" ({self.__class__.__name__}) is already linked to '
                                 f'"{self._object.name}" ({self._object.__class__.__name__})')
         self._object = object
+        self._citation.link_value(self)
 
     def unlink_object(self, object):
         if self._object is object:
             if not object.unlinking:
                 raise TheVerseError('Can only unlink an object by calling its ".unlink()" method')
             self._object = None
+            self._citation.unlink_value(self)
+
+
+def _unpickle_refstr(string: str, name: Optional[str], citation: Citation) -> RefStr:
+    return RefStr(string, name=name, citation=citation)
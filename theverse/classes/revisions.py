@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Point-in-time views of objects with dated attribute revisions.
+
+Views wrap existing objects and collections, resolving attribute values as
+of a date when they are accessed, so that no objects are copied.
+'''
+
+
+import collections.abc
+import datetime
+from typing import Iterator, Union
+from .base import Everything, LinkDict
+
+
+
+
+def parse_date(date: Union[str, datetime.date]) -> datetime.date:
+    '''
+    Convert an ISO date string (`YYYY-MM-DD`), a `datetime.date`, or a
+    `datetime.datetime` into a `datetime.date`.
+    '''
+    if isinstance(date, datetime.datetime):
+        return date.date()
+    if isinstance(date, datetime.date):
+        return date
+    if isinstance(date, str):
+        try:
+            return datetime.date.fromisoformat(date)
+        except ValueError:
+            raise ValueError(f'Invalid date "{date}"; expected "YYYY-MM-DD"')
+    raise TypeError
+
+
+
+
+class ObjectView(object):
+    '''
+    View of an object as of a date.  Quantity and string attributes resolve
+    to the latest revision dated on or before the view's date, and raise
+    `AttributeError` if no revision existed yet.  Attribute fallbacks are
+    resolved as of the same date.  Links and collections of links give
+    views with the same date.  Everything else is taken from the object
+    itself.
+    '''
+    __slots__ = ('_object', '_ordinal')
+
+    def __init__(self, object: Everything, ordinal: int):
+        self._object = object
+        self._ordinal = ordinal
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} of {self._object.__class__.__name__} '
+                f'"{self._object.name}" as of {datetime.date.fromordinal(self._ordinal)}>')
+
+    @property
+    def object(self) -> Everything:
+        return self._object
+
+    @property
+    def date(self) -> datetime.date:
+        return datetime.date.fromordinal(self._ordinal)
+
+    def __getattr__(self, attr):
+        obj = self._object
+        if attr in obj._attr_value_procs:
+            try:
+                return obj._value_as_of(attr, self._ordinal)
+            except AttributeError:
+                # Attributes such as `radius` may be stored or may fall
+                # back to other attributes
+                if attr not in obj._attr_fallbacks:
+                    raise
+        try:
+            alias_or_aliases = obj._attr_fallbacks[attr]
+        except KeyError:
+            pass
+        else:
+            if isinstance(alias_or_aliases, str):
+                aliases = [alias_or_aliases]
+            else:
+                aliases = alias_or_aliases
+            for alias in aliases:
+                try:
+                    return getattr(self, alias)
+                except AttributeError:
+                    pass
+            raise AttributeError(f'{obj.__class__} has no attribute {repr(attr)} as of {self.date}')
+        value = getattr(obj, attr)
+        if isinstance(value, Everything):
+            return ObjectView(value, self._ordinal)
+        if isinstance(value, LinkDict):
+            return LinkDictView(value, self._ordinal)
+        return value
+
+
+
+
+class LinkDictView(collections.abc.Mapping):
+    '''
+    View of a `LinkDict` as of a date, mapping names to `ObjectView`
+    instances.  Values can be accessed as attributes.
+    '''
+    __slots__ = ('_linkdict', '_ordinal')
+
+    def __init__(self, linkdict: LinkDict, ordinal: int):
+        self._linkdict = linkdict
+        self._ordinal = ordinal
+
+    def __getitem__(self, key: str) -> ObjectView:
+        return ObjectView(self._linkdict[key], self._ordinal)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._linkdict)
+
+    def __len__(self):
+        return len(self._linkdict)
+
+    def __getattr__(self, attr):
+        return ObjectView(getattr(self._linkdict, attr), self._ordinal)
+
+
+
+
+class UniverseView(ObjectView):
+    '''
+    View of a universe as of a date.  Collections (`.planets`, `.stars`,
+    ...) are `LinkDictView` instances.
+    '''
+    __slots__ = ()
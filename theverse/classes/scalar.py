@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Lightweight scalar quantities for fast arithmetic.
+'''
+
+
+import numbers
+import operator
+from typing import Dict, Optional, Tuple, Union
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+# Interned units.  Units that are equal are represented by a single
+# instance, so that units can usually be compared by identity.
+_units: Dict[astropy.units.UnitBase, astropy.units.UnitBase] = {}
+# Cached results of unit arithmetic on interned units
+_unit_products: Dict[Tuple[int, int, int], astropy.units.UnitBase] = {}
+_unit_powers: Dict[Tuple[int, Union[int, float]], astropy.units.UnitBase] = {}
+
+_dimensionless = astropy.units.dimensionless_unscaled
+
+
+def intern_unit(unit: Union[str, astropy.units.UnitBase]) -> astropy.units.UnitBase:
+    '''
+    Return the shared instance of a unit.
+    '''
+    if not isinstance(unit, astropy.units.UnitBase):
+        unit = astropy.units.Unit(unit)
+    try:
+        return _units[unit]
+    except KeyError:
+        _units[unit] = unit
+        return unit
+
+intern_unit(_dimensionless)
+
+
+# Map units to the interned SI units they are equivalent to and the scale
+# factors from the units to the SI units
+_si_units: Dict[Union[str, astropy.units.UnitBase], Tuple[astropy.units.UnitBase, float]] = {}
+
+
+def _si_unit(unit: Union[str, astropy.units.UnitBase]) -> Tuple[astropy.units.UnitBase, float]:
+    try:
+        return _si_units[unit]
+    except KeyError:
+        pass
+    parsed_unit = unit if isinstance(unit, astropy.units.UnitBase) else astropy.units.Unit(unit)
+    si = parsed_unit.si
+    if si.scale == 1.0:
+        # Named SI units such as `J` are kept
+        result = (intern_unit(parsed_unit), 1.0)
+    else:
+        result = (intern_unit(si / si.scale), si.scale)
+    _si_units[unit] = result
+    return result
+
+
+def _unit_product(unit: astropy.units.UnitBase, other_unit: astropy.units.UnitBase, sign: int) -> astropy.units.UnitBase:
+    key = (id(unit), id(other_unit), sign)
+    try:
+        return _unit_products[key]
+    except KeyError:
+        if sign > 0:
+            result = intern_unit(unit * other_unit)
+        else:
+            result = intern_unit(unit / other_unit)
+        _unit_products[key] = result
+        return result
+
+
+def _unit_power(unit: astropy.units.UnitBase, power: Union[int, float]) -> astropy.units.UnitBase:
+    key = (id(unit), power)
+    try:
+        return _unit_powers[key]
+    except KeyError:
+        result = intern_unit(unit**power)
+        _unit_powers[key] = result
+        return result
+
+
+
+
+class Scalar(object):
+    '''
+    Compact scalar quantity:  a float value, an interned SI unit, and an
+    optional pointer to metadata (the `Quantity` the scalar was created
+    from, which provides the name, citation, and object).  Values in other
+    units are converted to SI units when scalars are created, like
+    `Quantity` values.
+
+    Arithmetic operates on plain floats, with unit algebra cached for each
+    combination of interned units, so it avoids the overhead of NumPy array
+    machinery.  Results of arithmetic have no metadata.  Use
+    `.to_quantity()` to convert to an Astropy `Quantity` when needed.
+
+    Scalars are created with `Quantity.to_scalar()` or
+    `Everything.scalar(attr)`.
+    '''
+    __slots__ = ('value', 'unit', 'meta')
+
+    # Make NumPy and Astropy defer to the reflected operators of `Scalar`
+    __array_ufunc__ = None
+
+    def __init__(self, value: float, unit: Union[str, astropy.units.UnitBase]=_dimensionless, meta=None):
+        self.unit, scale = _si_unit(unit)
+        self.value = float(value) * scale
+        self.meta = meta
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} value={self.value} unit={repr(self.unit)}>'
+
+    def __str__(self):
+        unit_str = self.unit.to_string()
+        if not unit_str:
+            return str(self.value)
+        return f'{self.value} {unit_str}'
+
+    @property
+    def name(self) -> Optional[str]:
+        return getattr(self.meta, 'name', None)
+
+    @property
+    def citation(self):
+        return getattr(self.meta, 'citation', None)
+
+    @property
+    def object(self):
+        return getattr(self.meta, 'object', None)
+
+    def to_quantity(self) -> astropy.units.Quantity:
+        return astropy.units.Quantity(self.value, self.unit)
+
+    def to(self, unit: Union[str, astropy.units.UnitBase]) -> 'Scalar':
+        '''
+        Convert to an equivalent SI unit (for example, from `kg m2 / s2` to
+        `J`).  Use `.to_quantity()` for other units.
+        '''
+        si_unit, scale = _si_unit(unit)
+        if scale != 1.0:
+            raise TheVerseError(f'Scalars are always in SI units; "{unit}" is not an SI unit')
+        if si_unit is self.unit:
+            return self
+        return Scalar(self.unit.to(si_unit, self.value), si_unit)
+
+    def _coerce(self, other) -> Optional['Scalar']:
+        if isinstance(other, Scalar):
+            return other
+        if isinstance(other, astropy.units.Quantity):
+            if not other.isscalar:
+                return None
+            return Scalar(other.value, other.unit)
+        if isinstance(other, numbers.Real):
+            return Scalar(other)
+        return None
+
+    def _value_in_unit(self, other: 'Scalar') -> float:
+        if other.unit is self.unit:
+            return other.value
+        return other.unit.to(self.unit, other.value)
+
+    def _add(self, other, op, reflected=False):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        other_value = self._value_in_unit(other)
+        if reflected:
+            return Scalar(op(other_value, self.value), self.unit)
+        return Scalar(op(self.value, other_value), self.unit)
+
+    def __add__(self, other):
+        return self._add(other, operator.add)
+
+    def __radd__(self, other):
+        return self._add(other, operator.add, True)
+
+    def __sub__(self, other):
+        return self._add(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._add(other, operator.sub, True)
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return Scalar(self.value * other.value, _unit_product(self.unit, other.unit, 1))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return Scalar(self.value / other.value, _unit_product(self.unit, other.unit, -1))
+
+    def __rtruediv__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return Scalar(other.value / self.value, _unit_product(other.unit, self.unit, -1))
+
+    def __pow__(self, power):
+        if not isinstance(power, numbers.Real):
+            return NotImplemented
+        return Scalar(self.value**power, _unit_power(self.unit, power))
+
+    def __neg__(self):
+        return Scalar(-self.value, self.unit)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Scalar(abs(self.value), self.unit)
+
+    def __float__(self):
+        if self.unit is not _dimensionless:
+            return float(self.unit.to(_dimensionless, self.value))
+        return self.value
+
+    def _compare(self, other, op):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return op(self.value, self._value_in_unit(other))
+
+    def __eq__(self, other):
+        try:
+            return self._compare(other, operator.eq)
+        except astropy.units.UnitsError:
+            return False
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    # Scalars in different but equivalent units can be equal
+    __hash__ = None
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Similarity search over objects in a normalized space of their quantities.
+'''
+
+
+from typing import List, Mapping, Sequence, Tuple, Union
+import numpy
+import astropy.units
+from .spatial import KDTree
+from ..err import TheVerseError
+
+
+
+
+class SimilarityIndex(object):
+    '''
+    Index for finding the objects most similar to an object or to a set of
+    values, based on quantity attributes `attrs`.
+
+    Each attribute is a dimension.  Attributes whose values are all positive
+    are log-scaled, so that similarity depends on ratios (a planet twice
+    Earth's mass is as far from Earth as one half its mass).  Each dimension
+    is then normalized to zero mean and unit standard deviation, so that
+    distances are in units of standard deviations.  Objects that lack any of
+    the attributes are not indexed.  Queries use a `KDTree`.
+    '''
+    def __init__(self, objects: Sequence, attrs: Sequence[str], columns: Sequence[astropy.units.Quantity]):
+        if not attrs:
+            raise TheVerseError('Similarity requires at least one attribute')
+        self.attrs = tuple(attrs)
+        self.units = []
+        values = []
+        for attr, column in zip(attrs, columns):
+            if not isinstance(column, astropy.units.Quantity):
+                raise TheVerseError(f'Attribute "{attr}" is not a quantity')
+            self.units.append(column.unit)
+            values.append(column.value)
+        values = numpy.array(values, dtype=float).reshape(len(attrs), -1).T
+        indexed = ~numpy.isnan(values).any(axis=1)
+        self.objects = [obj for obj, keep in zip(objects, indexed.tolist()) if keep]
+        values = values[indexed]
+        self.log_scaled = numpy.array([len(column) > 0 and bool((column > 0).all()) for column in values.T],
+                                      dtype=bool).reshape(len(attrs))
+        values[:, self.log_scaled] = numpy.log10(values[:, self.log_scaled])
+        if len(values) > 0:
+            self.means = values.mean(axis=0)
+            self.scales = values.std(axis=0)
+        else:
+            self.means = numpy.zeros(len(attrs))
+            self.scales = numpy.ones(len(attrs))
+        self.scales[self.scales == 0] = 1.0
+        self.tree = KDTree((values - self.means) / self.scales)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def transform(self, values: Sequence[float]) -> numpy.ndarray:
+        '''
+        Point in the normalized space for values of `.attrs` in `.units`.
+        '''
+        values = numpy.array(values, dtype=float)
+        if self.log_scaled.any():
+            if (values[self.log_scaled] <= 0).any():
+                attrs = [a for a, log, v in zip(self.attrs, self.log_scaled, values) if log and v <= 0]
+                raise TheVerseError(f'Values for {", ".join(attrs)} must be positive, since all indexed values are')
+            values[self.log_scaled] = numpy.log10(values[self.log_scaled])
+        return (values - self.means) / self.scales
+
+    def query(self, values: Mapping[str, Union[str, float, astropy.units.Quantity]], k: int=1,
+              exclude=None) -> List[Tuple[object, float]]:
+        '''
+        The `k` objects most similar to `values`, which maps each of `.attrs`
+        to a quantity (or a string such as `"2 earthMass"`, or a float in SI
+        units), as a list of `(object, distance)` tuples sorted by distance.
+        The object `exclude` is never included.
+        '''
+        if not isinstance(k, int):
+            raise TypeError
+        if k < 1:
+            raise ValueError
+        missing = set(self.attrs) - set(values)
+        if missing:
+            raise TheVerseError(f'Missing values for {", ".join(sorted(missing))}')
+        point = []
+        for attr, unit in zip(self.attrs, self.units):
+            value = values[attr]
+            if isinstance(value, str):
+                value = astropy.units.Quantity(value)
+            if isinstance(value, astropy.units.Quantity):
+                try:
+                    value = value.to_value(unit)
+                except astropy.units.UnitsError:
+                    raise TheVerseError(f'Invalid unit for "{attr}"; expected "{unit}", not "{value.unit}"')
+            point.append(value)
+        distances, indices = self.tree.query(self.transform(point), k + (exclude is not None))
+        results = []
+        for distance, index in zip(distances.tolist(), indices.tolist()):
+            obj = self.objects[index]
+            if obj is exclude:
+                continue
+            results.append((obj, distance))
+        return results[:k]
+
+    def most_similar(self, obj, k: int=1) -> List[Tuple[object, float]]:
+        '''
+        The `k` objects most similar to an object, excluding the object
+        itself.  See `.query()`.
+        '''
+        values = {}
+        for attr in self.attrs:
+            try:
+                values[attr] = getattr(obj, attr)
+            except AttributeError:
+                raise TheVerseError(f'"{obj.name}" ({obj.__class__.__name__}) does not have attribute "{attr}"')
+        return self.query(values, k, exclude=obj)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Spatial indexing of objects with positions.
+'''
+
+
+import heapq
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy
+import astropy.units
+from ..err import TheVerseError
+
+
+
+
+class KDTree(object):
+    '''
+    k-d tree over an array of points with shape `(n, k)`.
+
+    The tree is stored as flat arrays of nodes.  Each node has a bounding box
+    and a range of indices into `.order`, which is a permutation of point
+    indices in which the points of each node are contiguous.  Leaves contain
+    up to `leaf_size` points, which are checked with vectorized distance
+    calculations.
+    '''
+    def __init__(self, points: numpy.ndarray, *, leaf_size: int=16):
+        points = numpy.asarray(points, dtype=float)
+        if points.ndim != 2:
+            raise TypeError('Points must have shape (n, k)')
+        if leaf_size < 1:
+            raise ValueError
+        self.points = points
+        self.leaf_size = leaf_size
+        self.order = numpy.arange(len(points))
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._children: List[Tuple[int, int]] = []
+        self._mins: List[numpy.ndarray] = []
+        self._maxs: List[numpy.ndarray] = []
+        if len(points) > 0:
+            self._build(0, len(points))
+        self._mins = numpy.array(self._mins)
+        self._maxs = numpy.array(self._maxs)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._starts)
+        node_points = self.points[self.order[start:end]]
+        mins = node_points.min(axis=0)
+        maxs = node_points.max(axis=0)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._children.append((-1, -1))
+        self._mins.append(mins)
+        self._maxs.append(maxs)
+        if end - start <= self.leaf_size:
+            return node
+        dim = int(numpy.argmax(maxs - mins))
+        if maxs[dim] == mins[dim]:
+            # All points coincide, so they cannot be split
+            return node
+        mid = (start + end) // 2
+        partition = numpy.argpartition(node_points[:, dim], mid - start)
+        self.order[start:end] = self.order[start:end][partition]
+        left = self._build(start, mid)
+        right = self._build(mid, end)
+        self._children[node] = (left, right)
+        return node
+
+    def _min_dist2(self, node: int, point: numpy.ndarray) -> float:
+        delta = numpy.maximum(self._mins[node] - point, 0.0) + numpy.maximum(point - self._maxs[node], 0.0)
+        return float(delta @ delta)
+
+    def query(self, point: Sequence[float], k: int=1) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        '''
+        Find the `k` nearest points.  Returns arrays of distances and point
+        indices, sorted by distance.
+        '''
+        point = numpy.asarray(point, dtype=float)
+        if k < 1:
+            raise ValueError
+        if len(self.points) == 0:
+            return (numpy.empty(0), numpy.empty(0, dtype=int))
+        # Max-heap of best candidates, stored as (-dist2, index)
+        best: List[Tuple[float, int]] = []
+        # Min-heap of nodes to visit, ordered by distance to bounding box
+        to_visit = [(self._min_dist2(0, point), 0)]
+        while to_visit:
+            node_dist2, node = heapq.heappop(to_visit)
+            if len(best) == k and node_dist2 > -best[0][0]:
+                break
+            left, right = self._children[node]
+            if left < 0:
+                indices = self.order[self._starts[node]:self._ends[node]]
+                delta = self.points[indices] - point
+                dist2 = numpy.einsum('ij,ij->i', delta, delta)
+                for d2, index in zip(dist2.tolist(), indices.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, index))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, index))
+                continue
+            for child in (left, right):
+                heapq.heappush(to_visit, (self._min_dist2(child, point), child))
+        best.sort(key=lambda x: -x[0])
+        distances = numpy.sqrt(numpy.array([-d2 for d2, _ in best]))
+        indices = numpy.array([index for _, index in best], dtype=int)
+        return (distances, indices)
+
+    def query_radius(self, point: Sequence[float], radius: float) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        '''
+        Find all points within `radius` of a point.  Returns arrays of
+        distances and point indices, sorted by distance.
+        '''
+        point = numpy.asarray(point, dtype=float)
+        if len(self.points) == 0:
+            return (numpy.empty(0), numpy.empty(0, dtype=int))
+        radius2 = radius**2
+        found = []
+        to_visit = [0]
+        while to_visit:
+            node = to_visit.pop()
+            if self._min_dist2(node, point) > radius2:
+                continue
+            left, right = self._children[node]
+            if left < 0:
+                found.append(self.order[self._starts[node]:self._ends[node]])
+            else:
+                to_visit.extend((left, right))
+        if not found:
+            return (numpy.empty(0), numpy.empty(0, dtype=int))
+        indices = numpy.concatenate(found)
+        delta = self.points[indices] - point
+        distances = numpy.sqrt(numpy.einsum('ij,ij->i', delta, delta))
+        keep = distances <= radius
+        indices = indices[keep]
+        distances = distances[keep]
+        sort = numpy.argsort(distances, kind='stable')
+        return (distances[sort], indices[sort])
+
+
+
+
+class SpatialIndex(object):
+    '''
+    Spatial index over objects with a `.position` attribute (Cartesian
+    coordinates, as a length `Quantity` with shape `(3,)`).  Objects without a
+    position are not indexed.
+
+    Query centers may be objects with positions, Cartesian coordinates, or
+    `None` for the origin.  When the center is an object, it is excluded from
+    results.
+    '''
+    unit = astropy.units.m
+
+    def __init__(self, objects):
+        self.objects = []
+        positions = []
+        for obj in objects:
+            try:
+                position = obj.position
+            except AttributeError:
+                continue
+            self.objects.append(obj)
+            positions.append(position.to_value(self.unit))
+        self.tree = KDTree(numpy.array(positions).reshape(-1, 3))
+        # Unit vectors for directional (cone) queries.  Objects at the origin
+        # have no direction and never match.
+        norms = numpy.sqrt(numpy.einsum('ij,ij->i', self.tree.points, self.tree.points))
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            self._directions = self.tree.points / norms[:, numpy.newaxis]
+        self._directions[norms == 0] = 0.0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def _center(self, center) -> Tuple[numpy.ndarray, Optional[object]]:
+        if center is None:
+            return (numpy.zeros(3), None)
+        if isinstance(center, astropy.units.Quantity):
+            if center.shape != (3,):
+                raise TypeError('Center coordinates must have shape (3,)')
+            return (center.to_value(self.unit), None)
+        try:
+            position = center.position
+        except AttributeError:
+            raise TheVerseError(f'"{center.name}" ({center.__class__.__name__}) does not have a position')
+        return (position.to_value(self.unit), center)
+
+    def _results(self, distances, indices, exclude, limit=None):
+        results = []
+        for distance, index in zip(distances.tolist(), indices.tolist()):
+            obj = self.objects[index]
+            if obj is exclude:
+                continue
+            results.append((obj, distance * self.unit))
+            if limit is not None and len(results) == limit:
+                break
+        return results
+
+    def nearest(self, center=None, k: int=1) -> List[Tuple[object, astropy.units.Quantity]]:
+        '''
+        The `k` nearest objects to a center, as a list of `(object,
+        distance)` pairs sorted by distance.
+        '''
+        point, exclude = self._center(center)
+        query_k = k if exclude is None else k + 1
+        distances, indices = self.tree.query(point, min(query_k, len(self.tree)) or 1)
+        return self._results(distances, indices, exclude, k)
+
+    def within(self, radius: astropy.units.Quantity, center=None) -> List[Tuple[object, astropy.units.Quantity]]:
+        '''
+        All objects within `radius` of a center, as a list of `(object,
+        distance)` pairs sorted by distance.
+        '''
+        point, exclude = self._center(center)
+        distances, indices = self.tree.query_radius(point, radius.to_value(self.unit))
+        return self._results(distances, indices, exclude)
+
+    def cone(self,
+             right_ascension: astropy.units.Quantity,
+             declination: astropy.units.Quantity,
+             radius: astropy.units.Quantity,
+             *,
+             max_distance: Optional[astropy.units.Quantity]=None) -> List[Tuple[object, astropy.units.Quantity]]:
+        '''
+        All objects within an angular `radius` of a direction as seen from
+        the origin, optionally limited to `max_distance`, as a list of
+        `(object, distance)` pairs sorted by distance.
+        '''
+        direction = cartesian(1.0, right_ascension, declination)
+        cos_radius = numpy.cos(radius.to_value(astropy.units.rad))
+        if max_distance is None:
+            indices = numpy.flatnonzero(self._directions @ direction >= cos_radius)
+            points = self.tree.points[indices]
+            distances = numpy.sqrt(numpy.einsum('ij,ij->i', points, points))
+            sort = numpy.argsort(distances, kind='stable')
+            distances = distances[sort]
+            indices = indices[sort]
+        else:
+            distances, indices = self.tree.query_radius(numpy.zeros(3), max_distance.to_value(self.unit))
+            keep = self._directions[indices] @ direction >= cos_radius
+            distances = distances[keep]
+            indices = indices[keep]
+        return self._results(distances, indices, None)
+
+
+
+
+def cartesian(distance: Union[float, astropy.units.Quantity],
+              right_ascension: astropy.units.Quantity,
+              declination: astropy.units.Quantity) -> Union[numpy.ndarray, astropy.units.Quantity]:
+    '''
+    Convert equatorial coordinates to Cartesian coordinates, with the x-axis
+    toward right ascension 0 and the z-axis toward the north celestial pole.
+    '''
+    ra = right_ascension.to_value(astropy.units.rad)
+    dec = declination.to_value(astropy.units.rad)
+    cos_dec = numpy.cos(dec)
+    direction = numpy.array([cos_dec*numpy.cos(ra), cos_dec*numpy.sin(ra), numpy.sin(dec)])
+    return distance * direction
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Endless streams of batches, optionally prefetched on a background thread.
+'''
+
+
+import queue
+import threading
+from typing import Callable, Iterator, TypeVar
+
+
+
+
+T = TypeVar('T')
+
+
+def batches(make_batch: Callable[[], T]) -> Iterator[T]:
+    '''
+    Endless stream of batches from `make_batch()`, each created when it is
+    requested.
+    '''
+    while True:
+        yield make_batch()
+
+
+def prefetched_batches(make_batch: Callable[[], T], prefetch: int) -> Iterator[T]:
+    '''
+    Endless stream of batches from `make_batch()`, created on a background
+    thread up to `prefetch` batches ahead of the consumer.  The thread blocks
+    while that many batches are waiting, so a slow consumer limits how much
+    is created.  Errors in `make_batch()` are raised in the consumer.  The
+    thread stops when the stream is closed or garbage collected.
+    '''
+    if not isinstance(prefetch, int):
+        raise TypeError
+    if prefetch < 1:
+        raise ValueError('"prefetch" must be at least 1')
+    batch_queue: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def produce():
+        try:
+            while put((True, make_batch())):
+                pass
+        except BaseException as e:
+            put((False, e))
+
+    thread = threading.Thread(target=produce, name='theverse-stream-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, item = batch_queue.get()
+            if not ok:
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
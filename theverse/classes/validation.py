@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Validation of collections of objects against declarative rules.
+
+Rules are declared for each class in `_attr_rules`, as comparisons such as
+`polar_radius <= equatorial_radius` or `mass < primary.mass`.  Each side of
+a comparison of quantities is a formula (see `formula`), and the two sides
+must have compatible units, except that anything can be compared with zero
+(`mass > 0`).  Links can be compared with `==` and `!=`, for
+example `primary.planetary_system == planetary_system`.  Objects that lack a
+value that a rule needs are skipped by that rule.
+
+Rules are checked with NumPy over the cached columns of a collection.  Large
+collections are split into shards that are checked by a process pool.
+'''
+
+
+import ast
+import collections
+import concurrent.futures
+import functools
+import operator
+import os
+from typing import Any, List, Mapping, Optional, Tuple
+import numpy
+import astropy.units
+from .formula import CompiledFormula, _constant_value, attr_path_link, compile_formula
+from ..err import TheVerseError
+
+
+
+
+Violation = collections.namedtuple('Violation', ['collection', 'name', 'rule', 'values'])
+Violation.__doc__ = '''
+Rule violation by an object.  `values` maps each attribute path used by the
+rule to the object's value (a float in SI units, or the name of a linked
+object).
+'''
+
+_comparisons = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+
+
+class CompiledRule(object):
+    '''
+    Rule compiled for a class of objects.  `.columns` are the attribute
+    paths that the rule uses.
+    '''
+    def __init__(self, rule: str, comparison: Any,
+                 left: Optional[CompiledFormula], right: Optional[CompiledFormula], columns: Tuple[str, ...]):
+        self.rule = rule
+        self._comparison = comparison
+        self._left = left
+        self._right = right
+        self.columns = columns
+        self._column_units = {}
+        for formula in (left, right):
+            if formula is not None:
+                self._column_units.update(zip(formula.columns, formula.column_units))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {repr(self.rule)}>'
+
+    def column_arrays(self, linkdict) -> List[numpy.ndarray]:
+        '''
+        Arrays for `.columns` from a collection:  float arrays in SI units
+        for quantities, and object arrays of names for links.
+        '''
+        arrays = []
+        for path in self.columns:
+            column = linkdict.column(path)
+            if isinstance(column, astropy.units.Quantity):
+                column = column.to_value(self._column_units[path])
+            arrays.append(column)
+        return arrays
+
+    def violations(self, arrays: List[numpy.ndarray]) -> numpy.ndarray:
+        '''
+        Indices of objects that violate the rule, given arrays for
+        `.columns`.
+        '''
+        if self._left is None:
+            left, right = arrays
+            present = (left != None) & (right != None)
+            with numpy.errstate(invalid='ignore'):
+                ok = self._comparison(left, right)
+            return numpy.flatnonzero(present & ~ok.astype(bool))
+        size = len(arrays[0]) if arrays else 0
+        left_arrays = [arrays[self.columns.index(path)] for path in self._left.columns]
+        right_arrays = [arrays[self.columns.index(path)] for path in self._right.columns]
+        left = self._left.evaluate(left_arrays, size).value
+        right = self._right.evaluate(right_arrays, size, self._left.unit).value
+        with numpy.errstate(invalid='ignore'):
+            ok = self._comparison(left, right)
+        return numpy.flatnonzero(~ok & ~numpy.isnan(left) & ~numpy.isnan(right))
+
+
+@functools.lru_cache(maxsize=256)
+def compile_rule(cls, rule: str) -> CompiledRule:
+    '''
+    Parse and unit-check a rule for objects of class `cls`.  Compiled rules
+    are cached for each class and rule.
+    '''
+    if not isinstance(rule, str):
+        raise TypeError
+    try:
+        tree = ast.parse(rule.strip(), mode='eval')
+    except SyntaxError:
+        raise TheVerseError(f'Invalid rule "{rule}": syntax error')
+    node = tree.body
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1 or type(node.ops[0]) not in _comparisons:
+        raise TheVerseError(f'Invalid rule "{rule}": rules must be a single comparison')
+    comparison = _comparisons[type(node.ops[0])]
+    left_source = ast.get_source_segment(rule.strip(), node.left)
+    right_source = ast.get_source_segment(rule.strip(), node.comparators[0])
+
+    left_link = attr_path_link(cls, left_source.replace(' ', ''))
+    right_link = attr_path_link(cls, right_source.replace(' ', ''))
+    if left_link is not None or right_link is not None:
+        if left_link is None or right_link is None or comparison not in (operator.eq, operator.ne):
+            raise TheVerseError(f'Invalid rule "{rule}": links can only be compared to links, with "==" or "!="')
+        columns = (left_source.replace(' ', ''), right_source.replace(' ', ''))
+        return CompiledRule(rule, comparison, None, None, columns)
+
+    # Zero is zero in any unit
+    if _constant_value(node.left) == 0:
+        right = compile_formula(cls, right_source)
+        left = compile_formula(cls, f'0 * ({right_source})')
+    elif _constant_value(node.comparators[0]) == 0:
+        left = compile_formula(cls, left_source)
+        right = compile_formula(cls, f'0 * ({left_source})')
+    else:
+        left = compile_formula(cls, left_source)
+        right = compile_formula(cls, right_source)
+    try:
+        right.unit.to(left.unit)
+    except astropy.units.UnitsError:
+        raise TheVerseError(f'Invalid rule "{rule}": cannot compare "{left.unit}" and "{right.unit}"')
+    columns = tuple(dict.fromkeys(left.columns + right.columns))
+    return CompiledRule(rule, comparison, left, right, columns)
+
+
+
+
+def _check_shard(cls, rule: str, arrays: List[numpy.ndarray], offset: int) -> numpy.ndarray:
+    return compile_rule(cls, rule).violations(arrays) + offset
+
+
+def validate(collections: Mapping[str, Any], *, processes: Optional[int]=None,
+             shard_size: int=100_000) -> List[Violation]:
+    '''
+    Check collections (mapping names to `LinkDict` instances) against the
+    `_attr_rules` of the classes of their objects, and return a list of
+    violations, in order by collection, rule, and object.
+
+    Each rule is checked over shards of at most `shard_size` objects.  When
+    there is more than one shard, shards are checked by a pool of
+    `processes` worker processes (by default, one per CPU); with
+    `processes=1`, everything is checked in this process.
+    '''
+    if not isinstance(shard_size, int):
+        raise TypeError
+    if shard_size < 1:
+        raise ValueError('"shard_size" must be at least 1')
+    if processes is not None:
+        if not isinstance(processes, int):
+            raise TypeError
+        if processes < 1:
+            raise ValueError('"processes" must be at least 1')
+
+    # Columns are extracted (and cached) here, so that workers only receive
+    # arrays
+    tasks = []
+    checks = []
+    for collection_name, linkdict in collections.items():
+        classes = {type(obj) for obj in linkdict.values()}
+        if len(classes) > 1:
+            raise TheVerseError(f'Collection "{collection_name}" has objects of more than one class')
+        if not classes:
+            continue
+        cls = classes.pop()
+        for rule in cls._attr_rules:
+            compiled = compile_rule(cls, rule)
+            arrays = compiled.column_arrays(linkdict)
+            checks.append((collection_name, linkdict, compiled, arrays, len(tasks)))
+            for start in range(0, len(linkdict), shard_size):
+                tasks.append((cls, rule, [a[start:start+shard_size] for a in arrays], start))
+
+    if processes == 1 or all(offset == 0 for _, _, _, offset in tasks):
+        results = [_check_shard(*task) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+            results = list(executor.map(_check_shard, *zip(*tasks)))
+
+    violations = []
+    for n, (collection_name, linkdict, compiled, arrays, first_task) in enumerate(checks):
+        last_task = checks[n + 1][4] if n + 1 < len(checks) else len(tasks)
+        names = linkdict.column('name')
+        for indices in results[first_task:last_task]:
+            for i in indices.tolist():
+                values = {path: array[i] if array.dtype == object else array[i].item()
+                          for path, array in zip(compiled.columns, arrays)}
+                violations.append(Violation(collection_name, names[i], compiled.rule, values))
+    return violations
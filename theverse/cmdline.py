@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Command-line interface.
+'''
+
+
+import argparse
+import sys
+from .version import __version__
+
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='theverse',
+                                     description='Find properties of objects in our universe (and others)')
+    parser.add_argument('--version', action='version', version=f'theverse {__version__}')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve', help='Run a local HTTP/JSON problem-parameter server')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Host (default 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port (default 8000)')
+    serve_parser.add_argument('--workers', type=int, default=4, help='Number of worker threads (default 4)')
+    serve_parser.add_argument('--universe', default=None, help='Name of universe to serve')
+    serve_parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+    if args.command == 'serve':
+        from .err import TheVerseError
+        from .server import serve
+        kwargs = {}
+        if args.universe is not None:
+            kwargs['universe'] = args.universe
+        try:
+            serve(args.host, args.port, workers=args.workers, quiet=args.quiet, **kwargs)
+        except TheVerseError as e:
+            sys.exit(f'theverse: {e}')
+    return 0
@@ -21,6 +21,13 @@ Planet(
     equatorial_radius='2439.7 km',
     polar_radius='2439.7 km',
     volumetric_mean_radius='2439.7 km',
+    # Mean orbital elements (J2000)
+    semimajor_axis='0.38709893 AU',
+    eccentricity='0.20563069',
+    inclination='7.00487 deg',
+    longitude_of_ascending_node='48.33167 deg',
+    longitude_of_perihelion='77.45645 deg',
+    mean_longitude='252.25084 deg',
 )
 
 
@@ -34,6 +41,13 @@ Planet(
     equatorial_radius='6051.8 km',
     polar_radius='6051.8 km',
     volumetric_mean_radius='6051.8 km',
+    # Mean orbital elements (J2000)
+    semimajor_axis='0.72333199 AU',
+    eccentricity='0.00677323',
+    inclination='3.39471 deg',
+    longitude_of_ascending_node='76.68069 deg',
+    longitude_of_perihelion='131.53298 deg',
+    mean_longitude='181.97973 deg',
 )
 
 
@@ -47,4 +61,11 @@ Planet(
     equatorial_radius='6378.137 km',
     polar_radius='6356.752 km',
     volumetric_mean_radius='6371.000 km',
+    # Mean orbital elements (J2000)
+    semimajor_axis='1.00000011 AU',
+    eccentricity='0.01671022',
+    inclination='0.00005 deg',
+    longitude_of_ascending_node='-11.26064 deg',
+    longitude_of_perihelion='102.94719 deg',
+    mean_longitude='100.46435 deg',
 )
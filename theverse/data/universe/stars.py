@@ -17,5 +17,6 @@ Star(
     reference_url='https://nssdc.gsfc.nasa.gov/planetary/factsheet/sunfact.html',
     planetary_system='Solar System',
     mass='1_988_500e24 kg',
+    distance='0 pc',
     spectral_type='G2 V',
 )
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2020, Geoffrey M. Poore
+# All rights reserved.
+#
+# Licensed under the BSD 3-Clause License:
+# http://opensource.org/licenses/BSD-3-Clause
+#
+
+
+'''
+Local HTTP/JSON server for problem parameters.
+
+The universe is loaded and frozen once when the server starts, and requests
+are handled by a fixed pool of worker threads that share it.  This avoids
+paying the Astropy import and data loading costs for every consumer.
+
+Endpoints:
+
+  * `GET /collections`:  names and sizes of all collections.
+
+  * `GET /sample?collection=planets&n=5&attrs=mass,radius&seed=1&replace=1`:
+    sample objects from a collection.
+
+  * `POST /sample`:  the same, with a JSON object of parameters as the body
+    (`attrs` is a list).  The body may also be a list of such objects, in
+    which case a list of results is returned.
+
+Sample results have the form `{"collection": ..., "names": [...], "attrs":
+{attr: [...]}, "units": {attr: unit}}`.  Quantities are given as numbers in
+SI units, links as names of linked objects, and missing values as `null`.
+
+Invalid requests, including attributes that are not in the schema of the
+collection's class, give status 400, and unexpected errors give status 500,
+both with a JSON body of the form `{"error": ...}`.
+'''
+
+
+import concurrent.futures
+import http.server
+import json
+import math
+import socketserver
+import traceback
+import urllib.parse
+from typing import Any, Dict, List, Optional
+import numpy
+import astropy.units
+from .classes import Universe
+from .classes.base import Primordial
+from .classes.formula import attr_path_kind
+from .err import TheVerseError
+
+
+
+
+def collection_names() -> List[str]:
+    return [k[1:] for k in Primordial.link_collection_name_to_module_names_registry]
+
+
+def _collection_class(collection: str):
+    classes = list(Primordial.__subclasses__())
+    while classes:
+        cls = classes.pop()
+        if cls._link_collection_name == collection:
+            return cls
+        classes.extend(cls.__subclasses__())
+    raise TheVerseError(f'Unknown collection "{collection}"')
+
+
+def sample(universe: Universe, collection: str, n: int, attrs: Optional[List[str]]=None, *,
+           seed: Optional[int]=None, replace: bool=False) -> Dict[str, Any]:
+    '''
+    Sample `n` objects from a collection, with values for attributes `attrs`,
+    in a form suitable for JSON.  Attributes may be dotted paths through
+    links, but must give quantities, strings, or links according to the
+    class schema.  Values are taken from cached columns.
+    '''
+    if collection not in collection_names():
+        raise TheVerseError(f'Unknown collection "{collection}"')
+    if attrs is None:
+        attrs = []
+    if not isinstance(attrs, list) or not all(isinstance(x, str) for x in attrs):
+        raise TypeError('"attrs" must be a list of strings')
+    cls = _collection_class(collection)
+    for attr in attrs:
+        if attr != 'name' and attr_path_kind(cls, attr) is None:
+            raise TheVerseError(f'"{attr}" is not a quantity, string, or link attribute of {cls.__name__}')
+    linkdict = getattr(universe, collection)
+    indices = linkdict._sample_indices(n, numpy.random.default_rng(seed), replace)
+    result = {
+        'collection': collection,
+        'names': linkdict.column('name')[indices].tolist(),
+        'attrs': {},
+        'units': {},
+    }
+    for attr in attrs:
+        column = linkdict.column(attr)
+        if isinstance(column, astropy.units.Quantity):
+            values = [None if math.isnan(x) else x for x in column.value[indices].tolist()]
+            result['units'][attr] = column.unit.to_string()
+        else:
+            values = [None if x is None else str(x) for x in column[indices].tolist()]
+        result['attrs'][attr] = values
+    return result
+
+
+def _sample_from_params(universe: Universe, params: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(params, dict):
+        raise TypeError('Parameters must be a JSON object')
+    unknown = set(params) - {'collection', 'n', 'attrs', 'seed', 'replace'}
+    if unknown:
+        raise TypeError(f'Unknown parameters {", ".join(sorted(unknown))}')
+    try:
+        collection = params['collection']
+    except KeyError:
+        raise TypeError('Missing parameter "collection"')
+    return sample(universe, collection, params.get('n', 1), params.get('attrs'),
+                  seed=params.get('seed'), replace=bool(params.get('replace', False)))
+
+
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    server: 'ProblemParameterServer'
+
+    def _send_json(self, status: int, data: Any):
+        body = json.dumps(data).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, compute):
+        try:
+            data = compute()
+        except (TheVerseError, TypeError, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            # Errors are reported to the client rather than ending the
+            # worker's handling of the request without a response
+            self.log_error('Error handling "%s": %s', self.path, traceback.format_exc())
+            self._send_json(500, {'error': f'Internal server error ({e.__class__.__name__})'})
+        else:
+            self._send_json(200, data)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/collections':
+            universe = self.server.universe
+            self._handle(lambda: {k: len(getattr(universe, k)) for k in collection_names()})
+        elif url.path == '/sample':
+            query = urllib.parse.parse_qs(url.query)
+            def compute():
+                params = {k: v[-1] for k, v in query.items()}
+                if 'n' in params:
+                    params['n'] = int(params['n'])
+                if 'seed' in params:
+                    params['seed'] = int(params['seed'])
+                if 'attrs' in params:
+                    params['attrs'] = [x for x in params['attrs'].split(',') if x]
+                if 'replace' in params:
+                    params['replace'] = params['replace'].lower() in ('1', 'true', 'yes')
+                return _sample_from_params(self.server.universe, params)
+            self._handle(compute)
+        else:
+            self._send_json(404, {'error': f'Unknown path "{url.path}"'})
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/sample':
+            self._send_json(404, {'error': f'Unknown path "{url.path}"'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        def compute():
+            try:
+                params = json.loads(self.rfile.read(length).decode('utf8'))
+            except ValueError:
+                raise ValueError('Request body must be valid JSON')
+            if isinstance(params, list):
+                return [_sample_from_params(self.server.universe, x) for x in params]
+            return _sample_from_params(self.server.universe, params)
+        self._handle(compute)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+
+
+class ProblemParameterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    '''
+    HTTP server that handles requests with a fixed pool of worker threads
+    sharing a single frozen universe.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address, universe: Universe, *, workers: int=4, quiet: bool=False):
+        # Load all collections once, so that workers never trigger loading
+        universe.freeze()
+        self.universe = universe
+        self.quiet = quiet
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        super().__init__(address, _RequestHandler)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def serve(host: str='127.0.0.1', port: int=8000, *, universe: str=Universe.default_name,
+          workers: int=4, quiet: bool=False):
+    try:
+        universe_obj = Universe._universes[universe]
+    except KeyError:
+        raise TheVerseError(f'Universe "{universe}" does not exist')
+    with ProblemParameterServer((host, port), universe_obj, workers=workers, quiet=quiet) as server:
+        if not quiet:
+            print(f'Serving universe "{universe_obj.name}" on http://{host}:{server.server_address[1]}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass